@@ -0,0 +1,377 @@
+"""
+Micro-benchmarks for the UVPomodoro widgets, run on the offscreen platform.
+
+Run from the project root:
+
+    python -m UVtimer.benchmarks theme startup countdown journal hooks tasks
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import contextlib
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt5.QtWidgets import QApplication, QWidget, QVBoxLayout, QLabel
+
+from UVtimer.utils import load_stylesheet
+
+
+def measure(func, repeat):
+    """
+    Call `func` `repeat` times and return the mean duration in milliseconds.
+    """
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) * 1000 / repeat
+
+
+def report(name, value, unit='ms'):
+    print(f"{name:<40} {value:10.4f} {unit}")
+
+
+@contextlib.contextmanager
+def temporary_working_directory():
+    """
+    Run the body in an empty temporary directory, so that the configuration,
+    journal and caches written by the windows are not those of the user.
+    """
+    previous = os.getcwd()
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        try:
+            yield directory
+        finally:
+            os.chdir(previous)
+
+
+def bench_theme(app, repeat):
+    """
+    Compare building timer-like widgets styled with inline stylesheets
+    against theme tokens, and time a runtime theme switch.
+    """
+    from UVtimer.theme import theme_manager
+
+    widgets = []
+
+    def build_inline():
+        container = QWidget()
+        layout = QVBoxLayout(container)
+        time_label = QLabel("25:00")
+        time_label.setStyleSheet("font-size: 48px; color: #88C0D0;")
+        session_label = QLabel("Session: 1")
+        session_label.setStyleSheet("font-size: 14px; color: #D8DEE9;")
+        layout.addWidget(time_label)
+        layout.addWidget(session_label)
+        container.ensurePolished()
+        time_label.ensurePolished()
+        session_label.ensurePolished()
+        widgets.append(container)
+
+    def build_themed():
+        container = QWidget()
+        layout = QVBoxLayout(container)
+        time_label = QLabel("25:00")
+        theme_manager.apply(time_label, 'timer')
+        session_label = QLabel("Session: 1")
+        theme_manager.apply(session_label, 'session')
+        layout.addWidget(time_label)
+        layout.addWidget(session_label)
+        container.ensurePolished()
+        time_label.ensurePolished()
+        session_label.ensurePolished()
+        widgets.append(container)
+
+    theme_manager.set_theme('nord')
+    report("construct with inline stylesheets", measure(build_inline, repeat))
+    for widget in widgets:
+        widget.deleteLater()
+    widgets.clear()
+    app.processEvents()
+
+    report("construct with theme tokens", measure(build_themed, repeat))
+    themes = iter(['dracula', 'nord'] * repeat)
+    report(f"switch theme ({repeat} themed widgets)", measure(lambda: theme_manager.set_theme(next(themes)), 10))
+
+
+def bench_startup(app, repeat):
+    """
+    Time from launch to the first paint of the countdown with its timer
+    running and no modal dialog open, through the settings window and
+    through a profile started directly. Runs with the default configuration
+    in a temporary directory.
+    """
+    from PyQt5.QtCore import QObject, QEvent
+    from UVtimer.config import load_config
+    from UVtimer.launcher import Launcher
+
+    repeat = min(repeat, 50)
+
+    class PaintWatcher(QObject):
+        """
+        Notes the first paint of the countdown while its timer is running.
+        """
+        painted = False
+        modal = None
+
+        def __init__(self, timer):
+            super().__init__()
+            self.timer = timer
+
+        def eventFilter(self, watched, event):
+            if event.type() == QEvent.Paint and self.timer.isActive() and not self.painted:
+                self.painted = True
+                self.modal = app.activeModalWidget()
+            return False
+
+    def until_painted(start, timer_window):
+        # The countdown is painted once the shown window is exposed
+        watcher = PaintWatcher(timer_window.timer)
+        timer_window.time_label.installEventFilter(watcher)
+        while not watcher.painted:
+            app.processEvents()
+        elapsed = time.perf_counter() - start
+        timer_window.time_label.removeEventFilter(watcher)
+        # Nothing may stand between launch and a visible countdown
+        assert watcher.modal is None
+        return elapsed
+
+    def close(launcher):
+        # Stopping, unlike closing, also removes the session journal
+        launcher.timer_window.stop_timer()
+        app.processEvents()
+        app.sendPostedEvents(None, QEvent.DeferredDelete)
+        if launcher.settings_window is not None:
+            launcher.settings_window.deleteLater()
+        app.sendPostedEvents(None, QEvent.DeferredDelete)
+
+    def via_settings():
+        start = time.perf_counter()
+        launcher = Launcher()
+        launcher.show_settings()
+        app.processEvents()
+        launcher.settings_window.start_timer()
+        launcher.timer_window = launcher.settings_window.timer_window
+        elapsed = until_painted(start, launcher.timer_window)
+        close(launcher)
+        return elapsed
+
+    def via_profile():
+        start = time.perf_counter()
+        launcher = Launcher()
+        launcher.start_profile(config)
+        elapsed = until_painted(start, launcher.timer_window)
+        close(launcher)
+        return elapsed
+
+    with temporary_working_directory():
+        config = load_config()
+        for name, path in (("first countdown paint, settings window", via_settings),
+                           ("first countdown paint, --start profile", via_profile)):
+            path()
+            report(name, sum(path() for _ in range(repeat)) * 1000 / repeat)
+
+
+def bench_countdown(app, repeat):
+    """
+    Compare per-second updates of the glyph atlas countdown with the QLabel it replaced.
+    """
+    from PyQt5.QtCore import Qt
+    from UVtimer.countdown import CountdownDisplay
+    from UVtimer.theme import theme_manager
+
+    def run(widget):
+        widget.resize(200, 80)
+        widget.show()
+        app.processEvents()
+        ticks = iter(range(25 * 60, 0, -1))
+
+        def tick():
+            minutes, seconds = divmod(next(ticks), 60)
+            widget.setText(f"{minutes:02d}:{seconds:02d}")
+            app.processEvents()
+
+        elapsed = measure(tick, min(repeat, 25 * 60 - 1))
+        widget.close()
+        return elapsed
+
+    label = QLabel("25:00")
+    label.setAlignment(Qt.AlignCenter)
+    label.setStyleSheet("font-size: 48px; color: #88C0D0;")
+    report("tick, QLabel with inline stylesheet", run(label))
+
+    label = QLabel("25:00")
+    label.setAlignment(Qt.AlignCenter)
+    theme_manager.apply(label, 'timer')
+    report("tick, QLabel with theme tokens", run(label))
+
+    display = CountdownDisplay("25:00")
+    theme_manager.apply(display, 'timer')
+    report("tick, glyph atlas countdown", run(display))
+
+
+def bench_journal(app, repeat):
+    """
+    Time journal writes with batched fsync, a forced fsync and the resume read.
+    """
+    from UVtimer.journal import SessionJournal, SessionState, RUNNING, PAUSED, load_session
+
+    with tempfile.TemporaryDirectory() as directory:
+        journal = SessionJournal(os.path.join(directory, 'session.journal'), os.path.join(directory, 'session.json'))
+        journal.begin({'run_time': 25})
+        states = iter(range(10 ** 9))
+
+        def write():
+            n = next(states)
+            journal.record(SessionState(RUNNING if n % 2 else PAUSED, False, n, 1500, time.time() + 1500, 0.0))
+
+        def write_and_sync():
+            write()
+            journal.sync()
+
+        report("record, fsync batched", measure(write, repeat))
+        report("record + fsync", measure(write_and_sync, min(repeat, 100)))
+        journal.close()
+        report("resume (load last record)", measure(lambda: load_session(journal.path, journal.settings_path), repeat))
+
+
+def bench_hooks(app, repeat):
+    """
+    Time emit() on the GUI thread while every hook run goes to a slow local
+    stub HTTP server, then check what was delivered: each hook gets only its
+    own events, in the order they were emitted and ending on the latest one,
+    and every run is either completed or dropped.
+    """
+    import json
+    import threading
+    from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+    from UVtimer.hooks import HookDispatcher
+
+    received = []
+
+    class StubHandler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            payload = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+            received.append((self.path, payload['event'], payload['sequence']))
+            time.sleep(0.05)
+            self.send_response(204)
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}"
+    transitions = ['session_start', 'pause', 'resume', 'break_start']
+
+    def run(max_workers, max_pending):
+        received.clear()
+        dispatcher = HookDispatcher(max_workers=max_workers, max_pending=max_pending, timeout=1)
+        for event in transitions:
+            dispatcher.register_webhook(event, f"{url}/{event}")
+        dispatcher.register_webhook('*', f"{url}/all")
+        events = iter(enumerate(transitions * repeat))
+        last = {}
+
+        def emit():
+            sequence, event = next(events)
+            last[event] = last['all'] = sequence
+            dispatcher.emit(event, {'sequence': sequence})
+
+        elapsed = measure(emit, repeat)
+        dispatcher.shutdown(wait=True)
+
+        stats = dispatcher.stats()
+        # Every emit matches its own hook and the '*' hook
+        assert stats['completed'] + stats['dropped'] == repeat * 2, stats
+        assert stats['failed'] == 0 and stats['pending'] == 0, stats
+        assert len(received) == stats['completed'], (len(received), stats)
+        for hook in ['all'] + transitions:
+            delivered = [(event, sequence) for path, event, sequence in received if path == '/' + hook]
+            assert all(hook in ('all', event) for event, _ in delivered), (hook, delivered)
+            sequences = [sequence for _, sequence in delivered]
+            assert sequences == sorted(set(sequences)), (hook, sequences)
+            assert not sequences or sequences[-1] == last[hook], (hook, sequences, last)
+        return elapsed, stats
+
+    elapsed, stats = run(max_workers=2, max_pending=8)
+    report("emit, 5 webhooks at 50 ms each", elapsed)
+    print(f"delivered {stats['completed']} of {repeat * 2} runs, stats {stats}")
+
+    elapsed, stats = run(max_workers=1, max_pending=2)
+    report("emit, 1 worker, 2 runs waiting per hook", elapsed)
+    print(f"delivered {stats['completed']} of {repeat * 2} runs, stats {stats}")
+    assert repeat < 8 or stats['dropped'] > 0, stats
+
+    server.shutdown()
+    server.server_close()
+
+
+def bench_tasks(app, repeat):
+    """
+    Index 100k synthetic tasks and time type-ahead searches through the list model.
+    """
+    import random
+    from UVtimer.tasks import TaskStore, TaskListModel
+
+    rng = random.Random(0)
+    letters = 'abcdefghijklmnopqrstuvwxyz'
+    words = [''.join(rng.choice(letters) for _ in range(rng.randint(3, 9))) for _ in range(3000)]
+    words += ['deploy', 'review', 'backend', 'release', 'login', 'page']
+    titles = [' '.join(rng.choice(words) for _ in range(rng.randint(3, 7))) for _ in range(100000)]
+    # Words that are each in a quarter of the tasks but rarely share one
+    common = ['alpha', 'beta', 'task', 'job']
+    titles = [f"{title} {common[i % 4]}" if i % 1000 else f"{title} {' '.join(common)}" for i, title in enumerate(titles)]
+
+    with tempfile.TemporaryDirectory() as directory:
+        store = TaskStore(os.path.join(directory, 'tasks.json'))
+        start = time.perf_counter()
+        store.import_titles(titles)
+        report("index 100k tasks", (time.perf_counter() - start) * 1000)
+        start = time.perf_counter()
+        for title in titles[:200]:
+            store.record_use(title, when=rng.uniform(0, 3e7))
+        report("record use (200 sessions)", (time.perf_counter() - start) * 1000 / 200)
+
+        model = TaskListModel(store)
+        for typed in ("release login", "deploy page", "re", "alpha beta", "task job", "a b"):
+            queries = [typed[:n] for n in range(1, len(typed) + 1)]
+            keystrokes = iter(queries * repeat)
+            report(f"keystroke, '{typed}'", measure(lambda: model.set_query(next(keystrokes)), len(queries) * 20))
+        # The saves of record_use must land before the directory is removed
+        store.flush()
+
+
+BENCHMARKS = {
+    'theme': bench_theme,
+    'startup': bench_startup,
+    'countdown': bench_countdown,
+    'journal': bench_journal,
+    'hooks': bench_hooks,
+    'tasks': bench_tasks,
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="UVPomodoro micro-benchmarks.")
+    parser.add_argument('names', nargs='*', help=f"benchmarks to run: {', '.join(BENCHMARKS)} (default: all)")
+    parser.add_argument('--repeat', type=int, default=500, help="iterations per measurement")
+    args = parser.parse_args(argv)
+    for name in args.names:
+        if name not in BENCHMARKS:
+            parser.error(f"unknown benchmark: {name}")
+
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    app.setStyleSheet(load_stylesheet('style.qss'))
+    for name in args.names or BENCHMARKS:
+        print(f"[{name}]")
+        BENCHMARKS[name](app, args.repeat)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
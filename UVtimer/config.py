@@ -0,0 +1,80 @@
+import os
+import json
+
+from UVtimer.theme import DEFAULT_THEME
+
+CONFIG_PATH = 'config.json'
+PROFILES_PATH = 'profiles.json'
+
+
+def get_default_config():
+    """
+    Returns a dictionary with default configuration values.
+    """
+    return {
+        'run_time': 25,
+        'rest_time': 5,
+        'long_rest_time': 15,
+        'sessions_before_long_rest': 4,
+        'activate_micro_rest': False,
+        'display_session_counter': False,
+        'display_music_controller': False,
+        'notification_sound': "notification.mp3",
+        'background_music_folder': "bg_music",
+        'background_image': None,
+        'background_opacity': 30,
+        'theme': DEFAULT_THEME,
+    }
+
+
+def load_config():
+    """
+    Loads the configuration from a JSON file or returns default values if the file doesn't exist.
+    """
+    if os.path.exists(CONFIG_PATH):
+        with open(CONFIG_PATH, 'r') as f:
+            return json.load(f)
+    else:
+        return get_default_config()
+
+
+def save_config(config):
+    """
+    Saves the configuration to a JSON file.
+    """
+    with open(CONFIG_PATH, 'w') as f:
+        json.dump(config, f)
+
+
+def load_profiles():
+    """
+    Loads the named settings profiles, stored next to the configuration file.
+
+    Returns:
+        dict: Profile names mapped to configuration dictionaries.
+    """
+    if os.path.exists(PROFILES_PATH):
+        with open(PROFILES_PATH, 'r') as f:
+            return json.load(f)
+    return {}
+
+
+def save_profile(name, config):
+    """
+    Stores `config` as the profile `name`, replacing any profile with that name.
+    """
+    profiles = load_profiles()
+    profiles[name] = config
+    with open(PROFILES_PATH, 'w') as f:
+        json.dump(profiles, f, indent=2)
+
+
+def timer_settings(config):
+    """
+    Converts a configuration dictionary into the settings expected by TimerWindow.
+    Missing keys take their default values.
+    """
+    settings = get_default_config()
+    settings.update(config)
+    settings['background_opacity'] = settings['background_opacity'] / 100
+    return settings
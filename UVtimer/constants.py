@@ -7,4 +7,20 @@ RUN_MAX = 90
 REST_MIN = 3
 REST_MAX = 15
 LONG_REST_MIN = 10
-LONG_REST_MAX = 30
\ No newline at end of file
+LONG_REST_MAX = 30
+
+# Memory budget of the shared background image cache, in bytes
+IMAGE_CACHE_BUDGET = 16 * 1024 * 1024
+
+# Session event hooks: worker threads, runs waiting per hook, and timeout in seconds
+HOOK_WORKERS = 2
+HOOK_MAX_PENDING = 8
+HOOK_TIMEOUT = 5
+
+# Loudness normalization: target loudness and the largest correction, in dB
+LOUDNESS_TARGET = -20.0
+LOUDNESS_MAX_GAIN = 12.0
+
+# Volume of the notification sound at the target loudness; the headroom up to
+# 100 lets a quiet sound be raised by up to 6 dB
+NOTIFICATION_VOLUME = 50
@@ -0,0 +1,152 @@
+from PyQt5.QtWidgets import QWidget, QSizePolicy
+from PyQt5.QtGui import QPainter, QPixmap, QFontMetrics, QPalette
+from PyQt5.QtCore import Qt, QEvent, QRect, QSize
+
+GLYPHS = "0123456789:"
+
+
+class GlyphAtlas:
+    """
+    The digits and the colon pre-rendered once into a single pixmap.
+
+    Every digit gets a cell as wide as the widest digit, so the countdown does
+    not shift horizontally while it runs.
+    """
+    def __init__(self, font, color, device_pixel_ratio):
+        metrics = QFontMetrics(font)
+        self.digit_width = max(metrics.horizontalAdvance(c) for c in "0123456789")
+        self.colon_width = metrics.horizontalAdvance(":")
+        self.height = metrics.height()
+
+        # Cell of each glyph in logical and in device pixels
+        self.sources = {}
+        self.device_sources = {}
+        x = 0
+        for glyph in GLYPHS:
+            width = self.colon_width if glyph == ":" else self.digit_width
+            self.sources[glyph] = QRect(x, 0, width, self.height)
+            self.device_sources[glyph] = QRect(int(x * device_pixel_ratio), 0,
+                                               int(width * device_pixel_ratio), int(self.height * device_pixel_ratio))
+            x += width
+
+        self.pixmap = QPixmap(int(x * device_pixel_ratio), int(self.height * device_pixel_ratio))
+        self.pixmap.setDevicePixelRatio(device_pixel_ratio)
+        self.pixmap.fill(Qt.transparent)
+        painter = QPainter(self.pixmap)
+        painter.setFont(font)
+        painter.setPen(color)
+        for glyph, rect in self.sources.items():
+            painter.drawText(rect, Qt.AlignCenter, glyph)
+        painter.end()
+
+    def width(self, glyph):
+        """
+        Return the cell width of `glyph`, or 0 for characters outside the atlas.
+        """
+        rect = self.sources.get(glyph)
+        return rect.width() if rect is not None else 0
+
+
+# Atlases shared between widgets, keyed by font, color and device pixel ratio
+_atlases = {}
+
+
+def glyph_atlas(font, color, device_pixel_ratio):
+    key = (font.key(), color.rgba(), device_pixel_ratio)
+    atlas = _atlases.get(key)
+    if atlas is None:
+        atlas = _atlases[key] = GlyphAtlas(font, color, device_pixel_ratio)
+    return atlas
+
+
+class CountdownDisplay(QWidget):
+    """
+    A replacement for a QLabel showing "MM:SS".
+
+    Glyphs are copied from a shared atlas instead of being shaped and laid out
+    on every tick, and only the cells whose character changed are repainted,
+    so a seconds-only tick redraws one or two small rectangles. The font and
+    color come from the widget font and the WindowText palette role.
+    """
+    def __init__(self, text="", parent=None):
+        super().__init__(parent)
+        self.setSizePolicy(QSizePolicy.Preferred, QSizePolicy.Fixed)
+        self._text = text
+        self._atlas = None
+        self._cells = None
+
+    def text(self):
+        return self._text
+
+    def setText(self, text):
+        """
+        Show `text`, scheduling a repaint of the changed cells only.
+        """
+        previous = self._text
+        self._text = text
+        changed = [index for index, (old, new) in enumerate(zip(previous, text)) if old != new]
+        if len(previous) != len(text) or any(":" in (previous[i], text[i]) for i in changed):
+            # The cells move, so lay out and repaint everything
+            self._cells = None
+            self.updateGeometry()
+            self.update()
+            return
+        cells = self.cells()
+        for index in changed:
+            self.update(cells[index])
+
+    def atlas(self):
+        if self._atlas is None:
+            self._atlas = glyph_atlas(self.font(), self.palette().color(QPalette.WindowText), self.devicePixelRatioF())
+        return self._atlas
+
+    def cells(self):
+        """
+        Return the rectangle of every character, centered in the widget.
+        Digits share one cell width, so the layout only changes with the
+        size of the widget, the atlas or the position of the colon.
+        """
+        if self._cells is None:
+            atlas = self.atlas()
+            widths = [atlas.width(c) for c in self._text]
+            x = (self.width() - sum(widths)) // 2
+            y = (self.height() - atlas.height) // 2
+            self._cells = []
+            for width in widths:
+                self._cells.append(QRect(x, y, width, atlas.height))
+                x += width
+        return self._cells
+
+    def changeEvent(self, event):
+        if event.type() in (QEvent.FontChange, QEvent.PaletteChange):
+            self._atlas = None
+            self._cells = None
+            self.updateGeometry()
+            self.update()
+        super().changeEvent(event)
+
+    def resizeEvent(self, event):
+        self._cells = None
+        super().resizeEvent(event)
+
+    def paintEvent(self, event):
+        atlas = self.atlas()
+        if atlas.pixmap.devicePixelRatio() != self.devicePixelRatioF():
+            # Moved to a screen with another pixel ratio
+            self._atlas = None
+            self._cells = None
+            atlas = self.atlas()
+
+        painter = QPainter(self)
+        dirty = event.rect()
+        sources = atlas.device_sources
+        for glyph, target in zip(self._text, self.cells()):
+            if glyph in sources and target.intersects(dirty):
+                painter.drawPixmap(target, atlas.pixmap, sources[glyph])
+
+    def sizeHint(self):
+        atlas = self.atlas()
+        return QSize(sum(atlas.width(c) for c in self._text), atlas.height)
+
+    def minimumSizeHint(self):
+        return self.sizeHint()
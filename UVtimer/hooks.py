@@ -0,0 +1,193 @@
+import os
+import sys
+import json
+import importlib
+import threading
+import subprocess
+import urllib.request
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from UVtimer.constants import HOOK_WORKERS, HOOK_MAX_PENDING, HOOK_TIMEOUT
+
+# Transitions reported by the timer window
+EVENTS = (
+    'session_start',
+    'break_start',
+    'session_end',
+    'pause',
+    'resume',
+    'micro_rest_start',
+    'micro_rest_end',
+    'stop',
+)
+
+
+def command_action(command, timeout=HOOK_TIMEOUT):
+    """
+    Return an action that runs a shell command. The payload is passed in
+    environment variables such as UVPOMODORO_EVENT and UVPOMODORO_SESSION_COUNT.
+    """
+    def run(payload):
+        env = dict(os.environ)
+        for key, value in payload.items():
+            env['UVPOMODORO_' + key.upper()] = str(value)
+        subprocess.run(command, shell=True, env=env, timeout=timeout, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return run
+
+
+def webhook_action(url, timeout=HOOK_TIMEOUT):
+    """
+    Return an action that POSTs the payload as JSON to `url`.
+    """
+    def run(payload):
+        request = urllib.request.Request(url, data=json.dumps(payload).encode(),
+                                         headers={'Content-Type': 'application/json'}, method='POST')
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            response.read()
+    return run
+
+
+def import_callable(spec):
+    """
+    Return the function named by a 'module:function' string.
+    """
+    module_name, _, name = spec.partition(':')
+    if not module_name or not name:
+        raise ValueError(f"Expected 'module:function', got {spec!r}")
+    return getattr(importlib.import_module(module_name), name)
+
+
+class HookDispatcher:
+    """
+    Runs user hooks for session transitions on a bounded pool of worker threads.
+
+    emit() never blocks the caller. Every hook has its own queue of waiting
+    runs, drained by one task at a time, so a hook sees transitions one after
+    the other and in the order they happened. When a slow hook already has
+    `max_pending` runs waiting, the oldest is dropped: the hook falls behind
+    by at most that many transitions and always ends on the latest one.
+    Commands and webhooks are cut off after `timeout` seconds; Python
+    callables are expected to return promptly, since a thread cannot be
+    interrupted.
+    """
+    def __init__(self, max_workers=HOOK_WORKERS, max_pending=HOOK_MAX_PENDING, timeout=HOOK_TIMEOUT):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self._executor = None
+        self._lock = threading.Lock()
+        self._hooks = []
+        # Waiting payloads per hook action, and the actions being drained
+        self._queues = {}
+        self._draining = set()
+        self.completed = 0
+        self.failed = 0
+        self.dropped = 0
+
+    def register(self, event, action):
+        """
+        Call `action(payload)` on every `event`; '*' matches every event.
+        """
+        if event != '*' and event not in EVENTS:
+            raise ValueError(f"Unknown hook event: {event}")
+        self._hooks.append((event, action))
+
+    def register_command(self, event, command):
+        self.register(event, command_action(command, self.timeout))
+
+    def register_webhook(self, event, url):
+        self.register(event, webhook_action(url, self.timeout))
+
+    def configure(self, config):
+        """
+        Replace the registered hooks with the 'hooks' list of a configuration, e.g.
+
+            "hooks": [{"event": "break_start", "command": "notify-send Break"},
+                      {"event": "*", "webhook": "http://127.0.0.1:8000/pomodoro"},
+                      {"event": "pause", "callable": "my_hooks:on_pause"}]
+
+        An invalid entry is skipped with a warning, so it cannot stop the application from starting.
+        """
+        self._hooks = []
+        for spec in config.get('hooks', []):
+            try:
+                self.register_spec(spec)
+            except Exception as error:
+                print(f"Skipping hook {spec!r}: {error}", file=sys.stderr)
+
+    def register_spec(self, spec):
+        """
+        Register one entry of the 'hooks' configuration list.
+        """
+        event = spec.get('event', '*')
+        if 'command' in spec:
+            self.register_command(event, spec['command'])
+        elif 'webhook' in spec:
+            self.register_webhook(event, spec['webhook'])
+        elif 'callable' in spec:
+            self.register(event, import_callable(spec['callable']))
+        else:
+            raise ValueError("A hook needs a 'command', 'webhook' or 'callable'")
+
+    def emit(self, event, payload):
+        """
+        Schedule every hook registered for `event` with `payload`.
+        """
+        payload = dict(payload, event=event)
+        for hook_event, action in self._hooks:
+            if hook_event == '*' or hook_event == event:
+                self._submit(action, payload)
+
+    def stats(self):
+        """
+        Return the dispatcher counters as a dictionary.
+        """
+        with self._lock:
+            return {
+                'pending': sum(len(queue) for queue in self._queues.values()),
+                'completed': self.completed,
+                'failed': self.failed,
+                'dropped': self.dropped,
+            }
+
+    def shutdown(self, wait=True):
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+    def _submit(self, action, payload):
+        with self._lock:
+            queue = self._queues.setdefault(action, deque())
+            if len(queue) >= self.max_pending:
+                queue.popleft()
+                self.dropped += 1
+            queue.append(payload)
+            if action in self._draining:
+                return
+            self._draining.add(action)
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='uvpomodoro-hook')
+        self._executor.submit(self._drain, action)
+
+    def _drain(self, action):
+        queue = self._queues[action]
+        while True:
+            with self._lock:
+                if not queue:
+                    self._draining.discard(action)
+                    return
+                payload = queue.popleft()
+            try:
+                action(payload)
+            except Exception:
+                with self._lock:
+                    self.failed += 1
+            else:
+                with self._lock:
+                    self.completed += 1
+
+
+# Configured from config.json by main.py
+hook_dispatcher = HookDispatcher()
@@ -0,0 +1,155 @@
+import os
+from collections import OrderedDict
+
+from PyQt5.QtGui import QImageReader
+from PyQt5.QtCore import Qt, QSize
+
+from UVtimer.constants import IMAGE_CACHE_BUDGET
+
+
+def image_bytes(image):
+    """
+    Return the memory used by the pixel data of a QImage.
+    """
+    if hasattr(image, 'sizeInBytes'):
+        return image.sizeInBytes()
+    return image.byteCount()
+
+
+class ImageCache:
+    """
+    A least-recently-used cache of decoded images limited by a byte budget.
+
+    Only display-sized variants are stored: images are decoded directly at the
+    size they are drawn at. A smaller variant of a file that is already cached
+    at a larger size, such as a settings preview thumbnail of the timer
+    background, is scaled down from that entry instead of decoding the file
+    again. Entries are keyed by path, modification time, target size and
+    device pixel ratio, so an edited file is decoded again.
+    """
+    def __init__(self, budget=IMAGE_CACHE_BUDGET):
+        self._entries = OrderedDict()
+        self._budget = budget
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.derived = 0
+        self.evictions = 0
+
+    @property
+    def budget(self):
+        return self._budget
+
+    def set_budget(self, budget):
+        """
+        Change the byte budget, evicting entries if the cache is now over it.
+        """
+        self._budget = budget
+        self._evict()
+
+    def get(self, path, size, device_pixel_ratio=1.0):
+        """
+        Return the image at `path` scaled to fit within `size`, keeping its aspect ratio.
+
+        Args:
+            path (str): The path to the image file.
+            size (QSize): The logical size the image has to fit into.
+            device_pixel_ratio (float): The ratio of physical to logical pixels.
+
+        Returns:
+            QImage: The scaled image, or None if the file cannot be read.
+        """
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            return None
+
+        key = (path, mtime, size.width(), size.height(), device_pixel_ratio)
+        image = self._entries.get(key)
+        if image is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return image
+
+        self.misses += 1
+        image = self._derive(path, mtime, size, device_pixel_ratio)
+        if image is None:
+            image = self._decode(path, size, device_pixel_ratio)
+        if image is None:
+            return None
+
+        self._entries[key] = image
+        self.bytes += image_bytes(image)
+        self._evict()
+        return image
+
+    def clear(self):
+        """
+        Drop every entry. The counters are kept.
+        """
+        self._entries.clear()
+        self.bytes = 0
+
+    def stats(self):
+        """
+        Return the cache counters as a dictionary.
+        """
+        return {
+            'entries': len(self._entries),
+            'bytes': self.bytes,
+            'budget': self._budget,
+            'hits': self.hits,
+            'misses': self.misses,
+            'derived': self.derived,
+            'evictions': self.evictions,
+        }
+
+    def _derive(self, path, mtime, size, device_pixel_ratio):
+        """
+        Scale a cached variant of the same file down to `size`, or return None
+        if no cached variant is at least as large.
+        """
+        target = QSize(int(size.width() * device_pixel_ratio), int(size.height() * device_pixel_ratio))
+        for (entry_path, entry_mtime, *_), image in self._entries.items():
+            if entry_path != path or entry_mtime != mtime:
+                continue
+            fitted = image.size().scaled(target, Qt.KeepAspectRatio)
+            if fitted.width() <= image.width() and fitted.height() <= image.height():
+                derived = image.scaled(fitted, Qt.IgnoreAspectRatio, Qt.SmoothTransformation)
+                derived.setDevicePixelRatio(device_pixel_ratio)
+                self.derived += 1
+                return derived
+        return None
+
+    def _decode(self, path, size, device_pixel_ratio):
+        """
+        Decode the image at `path` straight to its display size.
+        """
+        reader = QImageReader(path)
+        reader.setAutoTransform(True)
+        source_size = reader.size()
+        target = QSize(int(size.width() * device_pixel_ratio), int(size.height() * device_pixel_ratio))
+        if source_size.isValid() and not source_size.isEmpty():
+            reader.setScaledSize(source_size.scaled(target, Qt.KeepAspectRatio))
+
+        image = reader.read()
+        if image.isNull():
+            return None
+        if not source_size.isValid():
+            # Some formats cannot report their size before decoding
+            image = image.scaled(target, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        image.setDevicePixelRatio(device_pixel_ratio)
+        return image
+
+    def _evict(self):
+        """
+        Remove least recently used entries until the cache fits its budget.
+        """
+        while self.bytes > self._budget and self._entries:
+            _, image = self._entries.popitem(last=False)
+            self.bytes -= image_bytes(image)
+            self.evictions += 1
+
+
+# Reopened timer windows find their background already decoded here
+image_cache = ImageCache()
@@ -0,0 +1,204 @@
+import os
+import json
+import time
+import zlib
+import struct
+from collections import namedtuple
+
+from PyQt5.QtCore import QTimer
+
+JOURNAL_PATH = 'session.journal'
+SESSION_SETTINGS_PATH = 'session.json'
+
+# How long a written record may wait before it is flushed to disk
+FSYNC_DELAY_MS = 2000
+
+# The journal is compacted to its last record once it holds this many
+MAX_RECORDS = 4096
+
+IDLE = 0
+RUNNING = 1
+PAUSED = 2
+
+# sequence, state, is_break, session_count, remaining seconds,
+# wall-clock deadline and micro-rest deadline, followed by a CRC32 of them
+RECORD_BODY = struct.Struct('<QBBxxIidd')
+RECORD_CRC = struct.Struct('<I')
+RECORD_SIZE = RECORD_BODY.size + RECORD_CRC.size
+
+# The task is not part of the fixed-size record: it is kept with the settings
+SessionState = namedtuple('SessionState', 'state is_break session_count remaining deadline micro_rest_deadline task',
+                          defaults=('',))
+
+
+def pack_record(sequence, session):
+    """
+    Encode `session` as a fixed-size record with a trailing checksum.
+    """
+    body = RECORD_BODY.pack(sequence, session.state, session.is_break, session.session_count,
+                            session.remaining, session.deadline, session.micro_rest_deadline)
+    return body + RECORD_CRC.pack(zlib.crc32(body))
+
+
+def unpack_record(data):
+    """
+    Decode a record, returning (sequence, SessionState) or None if it is torn or corrupt.
+    """
+    if len(data) != RECORD_SIZE:
+        return None
+    body = data[:RECORD_BODY.size]
+    if zlib.crc32(body) != RECORD_CRC.unpack(data[RECORD_BODY.size:])[0]:
+        return None
+    sequence, state, is_break, session_count, remaining, deadline, micro_rest_deadline = RECORD_BODY.unpack(body)
+    return sequence, SessionState(state, bool(is_break), session_count, remaining, deadline, micro_rest_deadline)
+
+
+class SessionJournal:
+    """
+    An append-only journal of the timer state.
+
+    A record is written only when the state changes, never on every tick.
+    Records reach the operating system immediately, so a crashed process
+    loses nothing, while fsync calls are batched through a single-shot timer.
+    The settings and the task of the session are kept in a small file next
+    to the journal, which is only rewritten when the task changes.
+    """
+    def __init__(self, path=JOURNAL_PATH, settings_path=SESSION_SETTINGS_PATH):
+        self.path = path
+        self.settings_path = settings_path
+        self._fd = None
+        self._sequence = 0
+        self._records = 0
+        self._last = None
+        self._settings = None
+        self._task = ''
+        self._fsync_timer = QTimer()
+        self._fsync_timer.setSingleShot(True)
+        self._fsync_timer.timeout.connect(self.sync)
+
+    def begin(self, settings):
+        """
+        Start a new journal for a timer running with `settings`.
+        """
+        self._settings = settings
+        self._task = ''
+        self._write_settings()
+        self.close()
+        self._fd = os.open(self.path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_APPEND, 0o644)
+        self._sequence = 0
+        self._records = 0
+        self._last = None
+
+    def record(self, session):
+        """
+        Append `session` if it differs from the last recorded state.
+        """
+        if self._fd is None or session == self._last:
+            return
+        if session.task != self._task:
+            self._task = session.task
+            self._write_settings()
+        self._sequence += 1
+        data = pack_record(self._sequence, session)
+        if self._records >= MAX_RECORDS:
+            self._compact(data)
+        else:
+            os.write(self._fd, data)
+            self._records += 1
+        self._last = session
+        if not self._fsync_timer.isActive():
+            self._fsync_timer.start(FSYNC_DELAY_MS)
+
+    def sync(self):
+        """
+        Flush the written records to disk.
+        """
+        self._fsync_timer.stop()
+        if self._fd is not None:
+            os.fsync(self._fd)
+
+    def clear(self):
+        """
+        Forget the session after the user stopped the timer, so it is not resumed.
+        """
+        self.close()
+        clear_session(self.path, self.settings_path)
+
+    def close(self):
+        if self._fd is not None:
+            self.sync()
+            os.close(self._fd)
+            self._fd = None
+
+    def _write_settings(self):
+        write_atomically(self.settings_path, json.dumps({'settings': self._settings, 'task': self._task}).encode())
+
+    def _compact(self, data):
+        """
+        Replace the journal with a file holding only the newest record.
+        """
+        self.close()
+        write_atomically(self.path, data)
+        self._fd = os.open(self.path, os.O_WRONLY | os.O_APPEND)
+        self._records = 1
+
+
+def write_atomically(path, data):
+    """
+    Write `data` to `path` so that readers see either the old or the new contents.
+    """
+    temporary_path = path + '.tmp'
+    with open(temporary_path, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporary_path, path)
+
+
+def load_session(path=JOURNAL_PATH, settings_path=SESSION_SETTINGS_PATH):
+    """
+    Return (settings, SessionState) of an interrupted session, or None.
+    The task of the session is read back with the settings.
+
+    Only the tail of the journal is read: a torn or corrupt last record is
+    skipped in favour of the one before it.
+    """
+    try:
+        with open(settings_path, 'r') as f:
+            stored = json.load(f)
+        settings = stored['settings']
+        with open(path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            end = size - size % RECORD_SIZE
+            for offset in (end - RECORD_SIZE, end - 2 * RECORD_SIZE):
+                if offset < 0:
+                    break
+                f.seek(offset)
+                record = unpack_record(f.read(RECORD_SIZE))
+                if record is not None:
+                    session = record[1]._replace(task=stored.get('task', ''))
+                    return (settings, session) if session.state != IDLE else None
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    return None
+
+
+def clear_session(path=JOURNAL_PATH, settings_path=SESSION_SETTINGS_PATH):
+    """
+    Remove the journal and its settings so no session is resumed.
+    """
+    for file_path in (path, settings_path):
+        try:
+            os.remove(file_path)
+        except FileNotFoundError:
+            pass
+
+
+def resumed_remaining(session, now=None):
+    """
+    Return the seconds left in the journaled phase, measured against the wall clock.
+    """
+    if session.state != RUNNING:
+        return session.remaining
+    now = time.time() if now is None else now
+    return max(0, int(round(session.deadline - now)))
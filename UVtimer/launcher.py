@@ -0,0 +1,42 @@
+from UVtimer.config import timer_settings
+
+
+class Launcher:
+    """
+    Owns the top-level windows. The settings window is only built the first
+    time it is needed, so starting a profile directly never constructs it.
+    """
+    def __init__(self):
+        self.settings_window = None
+        self.timer_window = None
+
+    def show_settings(self):
+        """
+        Shows the settings window, building it on first use.
+        """
+        from UVtimer.settings_window import SettingsWindow
+
+        self.timer_window = None
+        if self.settings_window is None:
+            self.settings_window = SettingsWindow()
+        self.settings_window.show()
+
+    def start_profile(self, config):
+        """
+        Opens the timer window straight from a profile configuration.
+        """
+        from UVtimer.timer_window import TimerWindow
+
+        self.timer_window = TimerWindow(timer_settings(config))
+        self.timer_window.stopped.connect(self.show_settings)
+        self.timer_window.show()
+
+    def resume(self, settings, session):
+        """
+        Reopens the timer window of an interrupted session.
+        """
+        from UVtimer.timer_window import TimerWindow
+
+        self.timer_window = TimerWindow(settings, resume=session)
+        self.timer_window.stopped.connect(self.show_settings)
+        self.timer_window.show()
@@ -0,0 +1,225 @@
+import os
+import json
+import wave
+import shutil
+import subprocess
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from UVtimer.constants import LOUDNESS_TARGET, LOUDNESS_MAX_GAIN
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+LOUDNESS_CACHE_PATH = 'loudness_cache.json'
+
+# Rate that compressed files are decoded at; loudness does not need more
+DECODE_RATE = 22050
+
+# Seconds ffmpeg may take to decode one file before it is given up on
+DECODE_TIMEOUT = 60
+
+# Gated block measurement in the style of EBU R128
+BLOCK_SECONDS = 0.4
+ABSOLUTE_GATE = -70.0
+RELATIVE_GATE = -10.0
+
+
+def read_wav(path):
+    """
+    Read a WAV file as mono float samples in [-1, 1] and its sample rate.
+    """
+    with wave.open(path, 'rb') as f:
+        channels, width, rate, frames = f.getnchannels(), f.getsampwidth(), f.getframerate(), f.getnframes()
+        data = f.readframes(frames)
+
+    if width == 1:
+        samples = (np.frombuffer(data, dtype=np.uint8).astype(np.float32) - 128) / 128
+    elif width == 3:
+        raw = np.frombuffer(data, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        samples = ((raw[:, 0] | (raw[:, 1] << 8) | (raw[:, 2] << 16)) << 8 >> 8) / float(2 ** 23)
+    else:
+        dtype = {2: np.int16, 4: np.int32}[width]
+        samples = np.frombuffer(data, dtype=dtype).astype(np.float32) / float(2 ** (8 * width - 1))
+    return samples.reshape(-1, channels).mean(axis=1), rate
+
+
+class DecoderUnavailable(Exception):
+    """
+    Raised when a file needs ffmpeg to be decoded and ffmpeg is not installed.
+    """
+
+
+def read_with_ffmpeg(path):
+    """
+    Decode any format ffmpeg understands to mono float samples.
+    """
+    ffmpeg = shutil.which('ffmpeg')
+    if ffmpeg is None:
+        raise DecoderUnavailable(path)
+    result = subprocess.run([ffmpeg, '-v', 'quiet', '-i', path, '-f', 'f32le', '-ac', '1', '-ar', str(DECODE_RATE), '-'],
+                            stdout=subprocess.PIPE, check=True, timeout=DECODE_TIMEOUT)
+    return np.frombuffer(result.stdout, dtype=np.float32), DECODE_RATE
+
+
+def integrated_loudness(samples, rate):
+    """
+    Return the gated loudness of `samples` in dB relative to full scale.
+
+    The signal is cut into 400 ms blocks whose mean square is computed in one
+    vectorized pass. Blocks below the absolute gate, and then those more
+    than 10 dB below the average of the rest, are ignored. No K-weighting
+    filter is applied.
+    """
+    block = max(1, int(rate * BLOCK_SECONDS))
+    count = len(samples) // block
+    if count == 0:
+        blocks = np.asarray(samples, dtype=np.float64).reshape(1, -1)
+    else:
+        blocks = np.asarray(samples[:count * block], dtype=np.float64).reshape(count, block)
+    power = np.mean(blocks * blocks, axis=1)
+
+    with np.errstate(divide='ignore'):
+        levels = 10 * np.log10(power)
+    power = power[levels > ABSOLUTE_GATE]
+    if power.size == 0:
+        return None
+    relative_gate = 10 * np.log10(power.mean()) + RELATIVE_GATE
+    with np.errstate(divide='ignore'):
+        power = power[10 * np.log10(power) > relative_gate]
+    return float(10 * np.log10(power.mean()))
+
+
+def analyze_file(path):
+    """
+    Measure the loudness of an audio file. Runs in a worker process.
+
+    Returns:
+        float: The loudness in dB, or None if the file cannot be decoded.
+
+    Raises:
+        DecoderUnavailable, subprocess.TimeoutExpired, OSError: The file could
+            not be tried, so it should be analyzed again later.
+    """
+    try:
+        if path.lower().endswith('.wav'):
+            decoded = read_wav(path)
+        else:
+            decoded = read_with_ffmpeg(path)
+    except (EOFError, KeyError, ValueError, wave.Error, subprocess.CalledProcessError):
+        return None
+    return integrated_loudness(*decoded)
+
+
+def volume_factor(loudness):
+    """
+    Return the linear volume factor that brings `loudness` to LOUDNESS_TARGET.
+    """
+    gain = max(-LOUDNESS_MAX_GAIN, min(LOUDNESS_MAX_GAIN, LOUDNESS_TARGET - loudness))
+    return 10 ** (gain / 20)
+
+
+class LoudnessAnalyzer(QObject):
+    """
+    Measures the loudness of audio files in a process pool and remembers the
+    result per file and modification time, so each file is analyzed once.
+    A file that could not be tried, because ffmpeg is missing or decoding
+    timed out, is not remembered and is analyzed again when next played.
+
+    Nothing is decoded on the GUI thread: analyze() only submits work, and
+    `analyzed` is emitted on the GUI thread when a file has been measured.
+    Without NumPy no analysis happens and every track plays unchanged.
+    """
+    analyzed = pyqtSignal(str)
+    _finished = pyqtSignal(str, float, object)
+    _abandoned = pyqtSignal(str)
+
+    def __init__(self, cache_path=LOUDNESS_CACHE_PATH):
+        super().__init__()
+        self.cache_path = cache_path
+        self._cache = None
+        self._executor = None
+        self._running = set()
+        self._finished.connect(self._store)
+        self._abandoned.connect(self._forget)
+
+    def cache(self):
+        if self._cache is None:
+            try:
+                with open(self.cache_path, 'r') as f:
+                    self._cache = json.load(f)
+            except (OSError, ValueError):
+                self._cache = {}
+        return self._cache
+
+    def factor(self, path):
+        """
+        Return the volume factor for `path`, or 1.0 if it is not analyzed yet.
+        """
+        entry = self.cache().get(os.path.abspath(path))
+        if entry is None or entry['loudness'] is None:
+            return 1.0
+        try:
+            if entry['mtime'] != os.path.getmtime(path):
+                return 1.0
+        except OSError:
+            return 1.0
+        return volume_factor(entry['loudness'])
+
+    def analyze(self, paths):
+        """
+        Queue every file in `paths` whose cached measurement is missing or stale.
+        """
+        if np is None:
+            return
+        cache = self.cache()
+        for path in paths:
+            path = os.path.abspath(path)
+            try:
+                mtime = os.path.getmtime(path)
+            except OSError:
+                continue
+            entry = cache.get(path)
+            if (entry is not None and entry['mtime'] == mtime) or path in self._running:
+                continue
+            if self._executor is None:
+                # Workers are spawned, not forked: a fork of the GUI process would
+                # inherit its Qt, hook and task threads in an unknown state
+                self._executor = ProcessPoolExecutor(max_workers=max(1, (os.cpu_count() or 2) - 1),
+                                                     mp_context=multiprocessing.get_context('spawn'))
+            self._running.add(path)
+            future = self._executor.submit(analyze_file, path)
+            future.add_done_callback(lambda f, path=path, mtime=mtime: self._done(f, path, mtime))
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _done(self, future, path, mtime):
+        # Called on an executor thread; the signal hands the result to the GUI thread
+        if future.cancelled():
+            return
+        if future.exception() is not None:
+            # Nothing is cached, so the file is tried again the next time it is played
+            self._abandoned.emit(path)
+        else:
+            self._finished.emit(path, mtime, future.result())
+
+    def _forget(self, path):
+        self._running.discard(path)
+
+    def _store(self, path, mtime, loudness):
+        self._running.discard(path)
+        self.cache()[path] = {'mtime': mtime, 'loudness': loudness}
+        with open(self.cache_path, 'w') as f:
+            json.dump(self._cache, f)
+        self.analyzed.emit(path)
+
+
+# One worker pool and one cache file for the whole application
+loudness_analyzer = LoudnessAnalyzer()
@@ -1,13 +1,60 @@
 # Import necessary modules from PyQt5
-from PyQt5.QtWidgets import QDialog, QVBoxLayout, QLabel, QPushButton, QApplication
+from PyQt5.QtWidgets import QWidget, QDialog, QVBoxLayout, QLabel, QPushButton, QApplication, QLineEdit, QListView
 from PyQt5.QtCore import Qt, QTimer
 # Import the micro rest duration constant
 from UVtimer.constants import MICRO_REST_DURATION
+from UVtimer.theme import theme_manager
+from UVtimer.tasks import TaskListModel, task_store
+
+
+class TaskPicker(QWidget):
+    """
+    A line edit with type-ahead search over the task list below it.
+    The list is filled once the tasks have been loaded in the background.
+    """
+    def __init__(self, task="", parent=None):
+        super().__init__(parent)
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        self.task_edit = QLineEdit(task)
+        self.task_edit.setPlaceholderText("Task for this session")
+        self.task_model = TaskListModel(task_store, self)
+        self.task_view = QListView()
+        self.task_view.setUniformItemSizes(True)
+        self.task_view.setModel(self.task_model)
+        self.task_view.clicked.connect(lambda index: self.task_edit.setText(self.task_model.data(index)))
+        self.task_edit.textEdited.connect(self.task_model.set_query)
+        layout.addWidget(self.task_edit)
+        layout.addWidget(self.task_view)
+
+        self.load_timer = QTimer(self)
+        self.load_timer.timeout.connect(self.show_tasks)
+        self.show_tasks()
+
+    def show_tasks(self):
+        """
+        Show the best ranked tasks if the task list is loaded, otherwise check again shortly.
+        """
+        if task_store.loaded:
+            self.load_timer.stop()
+            # Typing has already searched the list
+            if not self.task_edit.isModified():
+                self.task_model.set_query("")
+        elif not self.load_timer.isActive():
+            self.load_timer.start(100)
+
+    def task(self):
+        """
+        Return the entered task, or an empty string.
+        """
+        return self.task_edit.text().strip()
 
 
 class NotificationWindow(QDialog):
     """
     A class to create and manage a notification window that appears when a Pomodoro session ends.
+    Before a focus session it also lets the user pick the task the session is spent on.
     """
     def __init__(self, parent):
         # Initialize the dialog with specific Qt window flags
@@ -22,7 +69,7 @@ class NotificationWindow(QDialog):
         message = "Time to focus!" if parent.is_break else "Break time!"
         self.message_label = QLabel(message)
         self.message_label.setAlignment(Qt.AlignCenter)
-        self.message_label.setStyleSheet("font-size: 24px; color: #88C0D0;")
+        theme_manager.apply(self.message_label, 'notification')
 
         # Create buttons for starting next session and stopping the timer
         self.start_button = QPushButton("Start Next Session")
@@ -33,6 +80,14 @@ class NotificationWindow(QDialog):
 
         # Add widgets to the layout
         layout.addWidget(self.message_label)
+
+        # Let the user label the upcoming focus session with a task
+        self.task_picker = None
+        if parent.is_break:
+            self.task_picker = TaskPicker(parent.current_task)
+            layout.addWidget(self.task_picker)
+            self.setFixedSize(300, 400)
+
         layout.addWidget(self.start_button)
         layout.addWidget(self.stop_button)
 
@@ -40,6 +95,35 @@ class NotificationWindow(QDialog):
         screen = QApplication.primaryScreen().geometry()
         self.move(screen.center() - self.rect().center())
 
+    def task(self):
+        """
+        Return the task entered for the next session, or an empty string.
+        """
+        return self.task_picker.task() if self.task_picker is not None else ""
+
+
+class TaskDialog(QDialog):
+    """
+    A non-modal window for changing the task of the running session.
+    The timer keeps running while it is open, and closing it changes nothing.
+    """
+    def __init__(self, parent):
+        super().__init__(parent, Qt.Window | Qt.WindowStaysOnTopHint)
+        self.setWindowTitle("Task")
+        self.setFixedSize(300, 300)
+
+        layout = QVBoxLayout(self)
+        self.task_picker = TaskPicker(parent.current_task)
+        self.task_picker.task_edit.returnPressed.connect(self.accept)
+        layout.addWidget(self.task_picker)
+
+        self.set_button = QPushButton("Set Task")
+        self.set_button.clicked.connect(self.accept)
+        layout.addWidget(self.set_button)
+
+    def task(self):
+        return self.task_picker.task()
+
 
 class MicroRestNotification(QDialog):
     """
@@ -57,12 +141,12 @@ class MicroRestNotification(QDialog):
         # Create and style the message label
         self.message_label = QLabel("Take a break!")
         self.message_label.setAlignment(Qt.AlignCenter)
-        self.message_label.setStyleSheet("font-size: 24px; color: #88C0D0;")
+        theme_manager.apply(self.message_label, 'notification')
 
         # Create and style the timer label
         self.time_label = QLabel(str(MICRO_REST_DURATION))
         self.time_label.setAlignment(Qt.AlignCenter)
-        self.time_label.setStyleSheet("font-size: 48px; color: #88C0D0;")
+        theme_manager.apply(self.time_label, 'micro_rest_timer')
 
         # Create the continue button (initially disabled)
         self.continue_button = QPushButton("Continue")
@@ -74,9 +158,6 @@ class MicroRestNotification(QDialog):
         layout.addWidget(self.time_label)
         layout.addWidget(self.continue_button)
 
-        # TODO: Uncomment this line if you want to apply a custom stylesheet
-        # self.setStyleSheet(load_stylesheet('style.qss'))
-
         # Set up the timer for countdown
         self.timer = QTimer(self)
         self.timer.timeout.connect(self.update_timer)
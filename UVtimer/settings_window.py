@@ -1,12 +1,11 @@
 import os
-import json
 
 from PyQt5.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
-                             QLabel, QSlider, QPushButton, QCheckBox, QFileDialog)
+                             QLabel, QSlider, QPushButton, QCheckBox, QFileDialog, QInputDialog)
 from PyQt5.QtCore import Qt
 
 from UVtimer.constants import *
-from UVtimer.utils import load_stylesheet
+from UVtimer.config import load_config, save_config, save_profile, get_default_config, timer_settings
 
 
 class SettingsWindow(QMainWindow):
@@ -18,7 +17,6 @@ class SettingsWindow(QMainWindow):
         super().__init__()
         self.setWindowTitle("UVPomodoro Settings")
         self.setFixedSize(500, 400)
-        self.setStyleSheet(load_stylesheet('style.qss'))
 
         # Set up the main layout
         central_widget = QWidget()
@@ -26,7 +24,10 @@ class SettingsWindow(QMainWindow):
         self.layout = QVBoxLayout(central_widget)
 
         # Load existing configuration or use defaults
-        self.config = self.load_config()
+        self.config = load_config()
+
+        # The running timer window, if any; it deletes itself when closed
+        self.timer_window = None
 
         # Create sliders for main timer settings
         self.run_time_slider = self.create_slider_with_label("Run Time (minutes):", RUN_MIN, RUN_MAX, self.config.get('run_time', 25))
@@ -45,6 +46,10 @@ class SettingsWindow(QMainWindow):
         self.reset_defaults_button.clicked.connect(self.reset_to_defaults)
         button_layout.addWidget(self.reset_defaults_button)
 
+        self.save_profile_button = QPushButton("Save Profile")
+        self.save_profile_button.clicked.connect(self.save_as_profile)
+        button_layout.addWidget(self.save_profile_button)
+
         self.layout.addLayout(button_layout)
 
         # Create additional settings widget (initially hidden)
@@ -198,26 +203,16 @@ class SettingsWindow(QMainWindow):
         #     self.background_image_path.setText("Default")
         #     self.background_image_file = None
 
-    def load_config(self):
-        """
-        Loads the configuration from a JSON file or returns default values if the file doesn't exist.
-        """
-        config_path = 'config.json'
-        if os.path.exists(config_path):
-            with open(config_path, 'r') as f:
-                return json.load(f)
-        else:
-            return self.get_default_config()
-
-    def save_config(self):
+    def current_config(self):
         """
-        Saves the current configuration to a JSON file.
+        Returns the configuration described by the current state of the widgets.
         """
-        # Load the existing config first
-        existing_config = self.load_config()
+        # Keep old values for the files that were not chosen in this window,
+        # and the keys this window does not edit, such as 'theme' and 'hooks'
+        existing_config = load_config()
 
-        # Update the config with new values, keeping old values if not changed
-        config = {
+        config = dict(existing_config)
+        config.update({
             'run_time': self.run_time_slider.value(),
             'rest_time': self.rest_time_slider.value(),
             'long_rest_time': self.long_rest_time_slider.value(),
@@ -229,34 +224,24 @@ class SettingsWindow(QMainWindow):
             'background_music_folder': getattr(self, 'background_music_folder', existing_config.get('background_music_folder', "bg_music")),
             'background_image': getattr(self, 'background_image_file', existing_config.get('background_image', None)),
             'background_opacity': self.background_opacity_slider.value(),
-        }
-
-        with open('config.json', 'w') as f:
-            json.dump(config, f)
+        })
+        return config
 
-    def get_default_config(self):
+    def save_as_profile(self):
         """
-        Returns a dictionary with default configuration values.
+        Asks for a name and stores the current settings as a profile that can be
+        started directly with `main.py --start <name>`.
         """
-        return {
-            'run_time': 25,
-            'rest_time': 5,
-            'long_rest_time': 15,
-            'sessions_before_long_rest': 4,
-            'activate_micro_rest': False,
-            'display_session_counter': False,
-            'display_music_controller': False,
-            'notification_sound': "notification.mp3",
-            'background_music_folder': "bg_music",
-            'background_image': None,
-            'background_opacity': 30,
-        }
+        name, ok = QInputDialog.getText(self, "Save Profile", "Profile name:")
+        name = name.strip()
+        if ok and name:
+            save_profile(name, self.current_config())
 
     def reset_to_defaults(self):
         """
         Resets all settings to their default values.
         """
-        default_config = self.get_default_config()
+        default_config = get_default_config()
         self.run_time_slider.setValue(default_config['run_time'])
         self.rest_time_slider.setValue(default_config['rest_time'])
         self.long_rest_time_slider.setValue(default_config['long_rest_time'])
@@ -279,23 +264,16 @@ class SettingsWindow(QMainWindow):
         """
         from UVtimer.timer_window import TimerWindow
 
-        # Load the existing config first
-        existing_config = self.load_config()
-        
-        settings = {
-            'run_time': self.run_time_slider.value(),
-            'rest_time': self.rest_time_slider.value(),
-            'long_rest_time': self.long_rest_time_slider.value(),
-            'sessions_before_long_rest': self.sessions_before_long_rest_slider.value(),
-            'activate_micro_rest': self.activate_micro_rest.isChecked(),
-            'display_session_counter': self.display_session_counter.isChecked(),
-            'display_music_controller': self.display_music_controller.isChecked(),
-            'notification_sound': getattr(self, 'notification_sound_file', existing_config.get('notification_sound', "notification.mp3")),
-            'background_music_folder': getattr(self, 'background_music_folder', existing_config.get('background_music_folder', "bg_music")),
-            'background_image': getattr(self, 'background_image_file', existing_config.get('background_image', None)),
-            'background_opacity': self.background_opacity_slider.value() / 100,
-        }
-        self.save_config()
-        self.timer_window = TimerWindow(settings)
+        config = self.current_config()
+        save_config(config)
+        self.timer_window = TimerWindow(timer_settings(config))
+        self.timer_window.stopped.connect(self.on_timer_stopped)
         self.timer_window.show()
         self.hide()
+
+    def on_timer_stopped(self):
+        """
+        Drops the reference to the closed timer window and shows the settings again.
+        """
+        self.timer_window = None
+        self.show()
@@ -0,0 +1,196 @@
+"""
+Soak test for the window lifecycle.
+
+Drives thousands of start/skip/stop cycles through the settings and timer
+windows on the offscreen platform and checks that resident memory and the
+number of live Qt objects stay flat. The cycles run in a temporary directory
+with music, the session counter, micro-rests and a background image enabled,
+so the configuration of the user is neither used nor overwritten.
+
+Run from the project root:
+
+    python -m UVtimer.soak --cycles 10000
+"""
+import os
+import gc
+import sys
+import math
+import wave
+import json
+import struct
+import argparse
+import tempfile
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt5 import sip
+from PyQt5.QtWidgets import QApplication
+from PyQt5.QtGui import QImage, QColor
+from PyQt5.QtCore import QObject, QEvent, QTimer
+
+
+def current_rss():
+    """
+    Return the current resident set size of the process in bytes.
+
+    Reads /proc/self/statm where available and falls back to the peak RSS
+    reported by the resource module.
+    """
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def count_qt_objects(app):
+    """
+    Return the number of live QObjects: every object Python holds a wrapper
+    for, parentless ones such as an unowned media player included, every
+    widget, and everything owned by either of them.
+    """
+    gc.collect()
+    objects = {o for o in gc.get_objects() if isinstance(o, QObject) and not sip.isdeleted(o)}
+    objects.update(app.allWidgets())
+    for root in [o for o in objects if o.parent() is None]:
+        objects.update(root.findChildren(QObject))
+    return len(objects)
+
+
+def write_tone(path, seconds=0.5, rate=8000):
+    """
+    Write a short mono sine tone as a 16-bit WAV file.
+    """
+    frames = b''.join(struct.pack('<h', int(8000 * math.sin(2 * math.pi * 440 * i / rate)))
+                      for i in range(int(seconds * rate)))
+    with wave.open(path, 'wb') as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(rate)
+        f.writeframes(frames)
+
+
+def write_config(directory):
+    """
+    Write a configuration with every optional timer feature enabled, along
+    with the sounds and the background image it refers to, into `directory`.
+    """
+    music_folder = os.path.join(directory, 'bg_music')
+    os.mkdir(music_folder)
+    for name in ('first.wav', 'second.wav'):
+        write_tone(os.path.join(music_folder, name))
+    notification_sound = os.path.join(directory, 'notification.wav')
+    write_tone(notification_sound)
+
+    background_image = os.path.join(directory, 'background.png')
+    image = QImage(1600, 1200, QImage.Format_RGB32)
+    image.fill(QColor('#5E81AC'))
+    image.save(background_image)
+
+    config = {
+        'run_time': 25,
+        'rest_time': 5,
+        'long_rest_time': 15,
+        'sessions_before_long_rest': 4,
+        'activate_micro_rest': True,
+        'display_session_counter': True,
+        'display_music_controller': True,
+        'notification_sound': notification_sound,
+        'background_music_folder': music_folder,
+        'background_image': background_image,
+        'background_opacity': 30,
+    }
+    with open(os.path.join(directory, 'config.json'), 'w') as f:
+        json.dump(config, f)
+
+
+def flush_deleted(app):
+    """
+    Process pending events, including deferred deletes from closed windows.
+    """
+    app.processEvents()
+    app.sendPostedEvents(None, QEvent.DeferredDelete)
+    app.processEvents()
+
+
+def accept_modal(app):
+    """
+    Accept the active modal dialog so that skip_session does not block.
+    """
+    dialog = app.activeModalWidget()
+    if dialog is not None:
+        dialog.accept()
+
+
+def run_cycle(app, settings_window):
+    """
+    Start a timer, skip one session and stop the timer.
+    """
+    settings_window.start_timer()
+    timer_window = settings_window.timer_window
+    QTimer.singleShot(0, lambda: accept_modal(app))
+    timer_window.skip_session()
+    timer_window.stop_timer()
+    flush_deleted(app)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Window lifecycle soak test.")
+    parser.add_argument('--cycles', type=int, default=10000, help="number of start/skip/stop cycles")
+    parser.add_argument('--warmup', type=int, default=200, help="cycles to run before taking the baseline")
+    parser.add_argument('--rss-tolerance', type=float, default=8.0, help="allowed RSS growth in MiB")
+    args = parser.parse_args(argv)
+
+    from UVtimer.settings_window import SettingsWindow
+    from UVtimer.loudness import loudness_analyzer
+    from UVtimer.utils import load_stylesheet
+
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    app.setStyleSheet(load_stylesheet('style.qss'))
+
+    working_directory = os.getcwd()
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        try:
+            write_config(directory)
+            return soak(app, SettingsWindow(), args)
+        finally:
+            loudness_analyzer.shutdown()
+            os.chdir(working_directory)
+
+
+def soak(app, settings_window, args):
+    """
+    Run the cycles and return 1 if memory or the Qt object count grew, else 0.
+    """
+    settings_window.show()
+
+    for _ in range(args.warmup):
+        run_cycle(app, settings_window)
+
+    baseline_rss = current_rss()
+    baseline_objects = count_qt_objects(app)
+
+    for i in range(1, args.cycles + 1):
+        run_cycle(app, settings_window)
+        if i % 1000 == 0:
+            print(f"cycle {i}: rss={current_rss() / 2**20:.1f} MiB objects={count_qt_objects(app)}")
+
+    rss_growth = (current_rss() - baseline_rss) / 2**20
+    objects = count_qt_objects(app)
+    print(f"rss growth: {rss_growth:.2f} MiB, qt objects: {baseline_objects} -> {objects}")
+
+    failures = []
+    if objects != baseline_objects:
+        failures.append(f"Qt object count changed from {baseline_objects} to {objects}")
+    if rss_growth > args.rss_tolerance:
+        failures.append(f"RSS grew by {rss_growth:.2f} MiB (tolerance {args.rss_tolerance} MiB)")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,377 @@
+import os
+import re
+import json
+import math
+import time
+import threading
+from bisect import bisect_left, insort
+from itertools import chain
+
+from PyQt5.QtCore import Qt, QAbstractListModel, QModelIndex
+
+TASKS_PATH = 'tasks.json'
+
+# Uses lose half of their weight in ranking after this many seconds
+RANKING_HALF_LIFE = 14 * 24 * 3600
+
+# Rows handed to a view per fetchMore call
+FETCH_BATCH = 50
+
+# Below this share of all tasks, candidates are sorted instead of scanning the ranking
+SPARSE_RATIO = 0.02
+
+WORD = re.compile(r'\w+')
+SET_BIT = re.compile('1')
+
+
+def normalize(title):
+    """
+    Return the lowercase words of `title` joined by spaces, with a leading space
+    so that word starts can be found with a plain substring test.
+    """
+    return ' ' + ' '.join(WORD.findall(title.lower()))
+
+
+# Longest word prefix used as an index key
+GRAM_LENGTH = 3
+
+
+def text_grams(text):
+    """
+    Return the index keys of a normalized title: the edge n-grams, i.e. the
+    prefixes of up to GRAM_LENGTH letters, of each of its words.
+    """
+    return {word[:n] for word in text.split() for n in range(1, min(len(word), GRAM_LENGTH) + 1)}
+
+
+def bitmap(task_ids, size):
+    """
+    Return an int with the bit of every id in `task_ids`, all below `size`, set.
+    """
+    data = bytearray(size // 8 + 1)
+    for task_id in task_ids:
+        data[task_id >> 3] |= 1 << (task_id & 7)
+    return int.from_bytes(data, 'little')
+
+
+class TaskStore:
+    """
+    The task titles sessions can be labelled with, their past use and a
+    search index over them.
+
+    Query words match the start of title words. The index maps word prefixes
+    of up to GRAM_LENGTH letters, and longer words, to posting lists of task
+    ids and is updated incrementally as tasks are added; a longer query word
+    is looked up through the sorted vocabulary of the words it starts. When
+    every query word is in more than SPARSE_RATIO of all tasks, their
+    candidates are intersected as bitmaps, built once per query word, so no
+    keystroke touches every candidate in Python. Tasks are ranked by frecency: a
+    log-sum of uses decayed by RANKING_HALF_LIFE, relative to a fixed origin so
+    that the order never changes by itself as time passes and recording a use
+    only moves one task in the ranking.
+    """
+    def __init__(self, path=TASKS_PATH):
+        self.path = path
+        self._loaded = False
+        self._load_lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._changed = threading.Condition()
+        self._dirty = False
+        self._writing = False
+        self._writer = None
+        self._titles = []
+        self._texts = []
+        self._uses = []
+        self._scores = []
+        self._ids = {}
+        self._postings = {}
+        self._words = {}
+        self._vocabulary = []
+        self._bitmaps = {}
+        self._ranking = []
+
+    @property
+    def loaded(self):
+        return self._loaded
+
+    def __len__(self):
+        self._load()
+        return len(self._titles)
+
+    def title(self, task_id):
+        return self._titles[task_id]
+
+    def uses(self, task_id):
+        return self._uses[task_id]
+
+    def add(self, title, uses=0, score=-math.inf):
+        """
+        Add a task unless one with the same words exists, and return its id.
+        """
+        self._load()
+        return self._add(title, uses, score)
+
+    def record_use(self, title, when=None):
+        """
+        Count a session spent on `title`, adding the task if it is new.
+        """
+        task_id = self.add(title)
+        when = time.time() if when is None else when
+        old_key = self._rank_key(task_id)
+        weight = when * math.log(2) / RANKING_HALF_LIFE
+        score = self._scores[task_id]
+        self._scores[task_id] = weight if score == -math.inf else max(score, weight) + math.log1p(math.exp(-abs(score - weight)))
+        self._uses[task_id] += 1
+
+        del self._ranking[bisect_left(self._ranking, old_key)]
+        insort(self._ranking, self._rank_key(task_id))
+        self.save(background=True)
+        return task_id
+
+    def search(self, query):
+        """
+        Yield the ids of tasks matching every word of `query`, best ranked first.
+
+        Results are produced lazily, so showing the first page never looks at
+        more tasks than needed. An empty query yields every task.
+        """
+        self._load()
+        words = WORD.findall(query.lower())
+        if not words:
+            return self._ranked_ids()
+
+        patterns = [' ' + word for word in words]
+        texts = self._texts
+        limit = SPARSE_RATIO * len(self._titles)
+
+        def matches(task_id):
+            text = texts[task_id]
+            return all(pattern in text for pattern in patterns)
+
+        def ranked(candidates):
+            return (task_id for task_id in sorted(candidates, key=self._rank_key) if matches(task_id))
+
+        postings = {word: self._postings_of(word) for word in words}
+        prefixes = sorted(postings, key=lambda word: sum(map(len, postings[word])))
+        rarest = postings[prefixes[0]]
+        if sum(map(len, rarest)) <= limit:
+            return ranked(rarest[0] if len(rarest) == 1 else set(chain.from_iterable(rarest)))
+        if len(prefixes) == 1:
+            # Most tasks match: walking the ranking finds a page quickly
+            return (task_id for task_id in self._ranked_ids() if matches(task_id))
+
+        # Every word is common, but they may rarely occur together
+        bits = self._bitmap(prefixes[0], rarest)
+        for prefix in prefixes[1:]:
+            bits &= self._bitmap(prefix, postings[prefix])
+        digits = bin(bits)[:1:-1]
+        if digits.count('1') <= limit:
+            return ranked([match.start() for match in SET_BIT.finditer(digits)])
+        member = bits.to_bytes(len(self._titles) // 8 + 1, 'little')
+        return (task_id for task_id in self._ranked_ids()
+                if member[task_id >> 3] >> (task_id & 7) & 1 and matches(task_id))
+
+    def import_titles(self, titles):
+        """
+        Add many tasks at once and save the store.
+        """
+        self._load()
+        for title in titles:
+            if title.strip():
+                self._add(title.strip(), 0, -math.inf, rank=False)
+        self._ranking = sorted(self._rank_key(task_id) for task_id in range(len(self._titles)))
+        self._vocabulary = sorted(self._words)
+        self._bitmaps.clear()
+        self.save()
+
+    def save(self, background=False):
+        """
+        Write the tasks to disk. With `background` set this only marks the store
+        as changed for the writer thread, so saves requested while it is busy
+        are merged into a single write.
+        """
+        if not background:
+            self._write()
+            return
+        with self._changed:
+            self._dirty = True
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._write_changes, name='uvpomodoro-tasks', daemon=True)
+                self._writer.start()
+            self._changed.notify_all()
+
+    def flush(self):
+        """
+        Wait until every background save has reached the disk.
+        """
+        with self._changed:
+            while self._dirty or self._writing:
+                self._changed.wait()
+
+    def _write_changes(self):
+        while True:
+            with self._changed:
+                while not self._dirty:
+                    self._changed.wait()
+                self._dirty = False
+                self._writing = True
+            try:
+                self._write()
+            except OSError:
+                # The tasks stay in memory; the next change writes them again
+                pass
+            with self._changed:
+                self._writing = False
+                self._changed.notify_all()
+
+    def _write(self):
+        # Changes made while the lists are copied mark the store dirty again
+        titles, uses, scores = list(self._titles), list(self._uses), list(self._scores)
+        tasks = [{'title': title, 'uses': count, 'score': score if score != -math.inf else None}
+                 for title, count, score in zip(titles, uses, scores)]
+        with self._save_lock:
+            temporary_path = self.path + '.tmp'
+            with open(temporary_path, 'w') as f:
+                json.dump(tasks, f, separators=(',', ':'))
+            os.replace(temporary_path, self.path)
+
+    def _postings_of(self, prefix):
+        """
+        Return the posting lists that together hold the tasks with a word starting with `prefix`.
+        """
+        if len(prefix) <= GRAM_LENGTH:
+            return [self._postings.get(prefix, [])]
+        vocabulary = self._vocabulary
+        start = bisect_left(vocabulary, prefix)
+        end = bisect_left(vocabulary, prefix + '\U0010ffff', start)
+        return [self._words[word] for word in vocabulary[start:end]]
+
+    def _bitmap(self, prefix, postings):
+        bits = self._bitmaps.get(prefix)
+        if bits is None:
+            bits = self._bitmaps[prefix] = bitmap(chain.from_iterable(postings), len(self._titles))
+        return bits
+
+    def _rank_key(self, task_id):
+        # Highest score first; among equal scores the newest task first
+        score = self._scores[task_id]
+        return (-score if score != -math.inf else math.inf, -task_id)
+
+    def _ranked_ids(self):
+        return (-negative_id for _, negative_id in self._ranking)
+
+    def _add(self, title, uses, score, rank=True):
+        text = normalize(title)
+        task_id = self._ids.get(text)
+        if task_id is not None:
+            return task_id
+
+        task_id = len(self._titles)
+        self._titles.append(title)
+        self._texts.append(text)
+        self._uses.append(uses)
+        self._scores.append(score)
+        self._ids[text] = task_id
+        postings = self._postings
+        for gram in text_grams(text):
+            posting = postings.get(gram)
+            if posting is None:
+                postings[gram] = [task_id]
+            else:
+                posting.append(task_id)
+        for word in set(text.split()):
+            if len(word) > GRAM_LENGTH:
+                posting = self._words.get(word)
+                if posting is None:
+                    self._words[word] = [task_id]
+                    if rank:
+                        insort(self._vocabulary, word)
+                else:
+                    posting.append(task_id)
+        if rank:
+            insort(self._ranking, self._rank_key(task_id))
+            self._bitmaps.clear()
+        return task_id
+
+    def preload(self):
+        """
+        Load and index the tasks on a background thread, so the first search
+        after a long session does not have to wait for it.
+        """
+        if not self._loaded:
+            threading.Thread(target=self._load, daemon=True).start()
+
+    def _load(self):
+        with self._load_lock:
+            if self._loaded:
+                return
+            try:
+                with open(self.path, 'r') as f:
+                    tasks = json.load(f)
+            except (OSError, ValueError):
+                tasks = []
+            for task in tasks:
+                score = task.get('score')
+                self._add(task['title'], task.get('uses', 0), -math.inf if score is None else score, rank=False)
+            self._ranking = sorted(self._rank_key(task_id) for task_id in range(len(self._titles)))
+            self._vocabulary = sorted(self._words)
+            self._loaded = True
+
+
+class TaskListModel(QAbstractListModel):
+    """
+    A list model over the search results of a TaskStore.
+
+    Rows are pulled from the lazy search in batches as the view scrolls, so
+    neither the search nor the view touches more tasks than are shown.
+    """
+    def __init__(self, store, parent=None):
+        super().__init__(parent)
+        self.store = store
+        self._results = []
+        self._pending = iter(())
+        self._exhausted = True
+
+    def set_query(self, query):
+        """
+        Replace the rows with the first page of results for `query`.
+        """
+        self.beginResetModel()
+        self._pending = self.store.search(query)
+        self._exhausted = False
+        self._results = self._take(FETCH_BATCH)
+        self.endResetModel()
+
+    def task_id(self, row):
+        return self._results[row]
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._results)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if index.isValid() and role in (Qt.DisplayRole, Qt.EditRole):
+            return self.store.title(self._results[index.row()])
+        return None
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self._exhausted
+
+    def fetchMore(self, parent=QModelIndex()):
+        batch = self._take(FETCH_BATCH)
+        if batch:
+            self.beginInsertRows(QModelIndex(), len(self._results), len(self._results) + len(batch) - 1)
+            self._results.extend(batch)
+            self.endInsertRows()
+
+    def _take(self, count):
+        batch = []
+        for task_id in self._pending:
+            batch.append(task_id)
+            if len(batch) == count:
+                return batch
+        self._exhausted = True
+        return batch
+
+
+# Loaded on first use, or in the background when a timer starts
+task_store = TaskStore()
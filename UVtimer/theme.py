@@ -0,0 +1,178 @@
+from PyQt5.QtWidgets import QApplication
+from PyQt5.QtGui import QColor, QFont, QPalette
+
+
+# Colour and font tokens of each theme. Fonts are (pixel size, bold).
+THEMES = {
+    'nord': {
+        'colors': {
+            'text': '#f8f8f2',
+            'timer': '#88C0D0',
+            'session': '#D8DEE9',
+            'notification': '#88C0D0',
+            'background': '#2E3440',
+            'base': '#3B4252',
+            'alternate_base': '#434C5E',
+            'highlight': '#5E81AC',
+            'highlighted_text': '#ECEFF4',
+            'placeholder': '#7B88A1',
+            'pause': '#5E81AC',
+            'stop': '#BF616A',
+            'skip': '#EBCB8B',
+        },
+        'fonts': {
+            'base': (14, False),
+            'timer': (48, True),
+            'session': (14, True),
+            'notification': (24, True),
+        },
+    },
+    'dracula': {
+        'colors': {
+            'text': '#f8f8f2',
+            'timer': '#50fa7b',
+            'session': '#f8f8f2',
+            'notification': '#ff79c6',
+            'background': '#282a36',
+            'base': '#44475a',
+            'alternate_base': '#3c3f52',
+            'highlight': '#bd93f9',
+            'highlighted_text': '#282a36',
+            'placeholder': '#6272a4',
+            'pause': '#6272a4',
+            'stop': '#ff5555',
+            'skip': '#f1fa8c',
+        },
+        'fonts': {
+            'base': (14, False),
+            'timer': (48, True),
+            'session': (14, True),
+            'notification': (24, True),
+        },
+    },
+}
+
+DEFAULT_THEME = 'nord'
+FONT_FAMILY = 'Roboto'
+
+# What each widget role takes from the theme: palette colours, a font and Qt properties
+ROLES = {
+    'timer_window': {'palette': {QPalette.Window: 'background'}},
+    'timer': {'palette': {QPalette.WindowText: 'timer'}, 'font': 'timer'},
+    'session': {'palette': {QPalette.WindowText: 'session'}, 'font': 'session'},
+    'notification': {'palette': {QPalette.WindowText: 'notification'}, 'font': 'notification'},
+    'micro_rest_timer': {'palette': {QPalette.WindowText: 'notification'}, 'font': 'timer'},
+    'pause_button': {'properties': {'iconColor': 'pause'}},
+    'stop_button': {'properties': {'iconColor': 'stop'}},
+    'skip_button': {'properties': {'iconColor': 'skip'}},
+}
+
+# Dynamic property that marks a widget as themed, so theme switches can find it
+ROLE_PROPERTY = 'themeRole'
+
+
+class Theme:
+    """
+    The tokens of one theme resolved into QColor, QFont and QPalette objects.
+    Resolution happens once; applying a theme only hands out these objects.
+    """
+    def __init__(self, name, colors, fonts):
+        self.name = name
+        self.colors = {token: QColor(value) for token, value in colors.items()}
+        self.fonts = {token: self.make_font(size, bold) for token, (size, bold) in fonts.items()}
+
+        # Application-wide palette, replacing the colour rules of the stylesheet
+        self.palette = QPalette(QApplication.palette())
+        for role in (QPalette.WindowText, QPalette.Text, QPalette.ButtonText):
+            self.palette.setColor(role, self.colors['text'])
+        # Backgrounds of input fields and item views, which the text has to stand out from
+        self.palette.setColor(QPalette.Base, self.colors['base'])
+        self.palette.setColor(QPalette.AlternateBase, self.colors['alternate_base'])
+        self.palette.setColor(QPalette.Highlight, self.colors['highlight'])
+        self.palette.setColor(QPalette.HighlightedText, self.colors['highlighted_text'])
+        if hasattr(QPalette, 'PlaceholderText'):
+            self.palette.setColor(QPalette.PlaceholderText, self.colors['placeholder'])
+
+        self.role_palettes = {}
+        for role, spec in ROLES.items():
+            if 'palette' in spec:
+                palette = QPalette(self.palette)
+                for color_role, token in spec['palette'].items():
+                    palette.setColor(color_role, self.colors[token])
+                self.role_palettes[role] = palette
+
+    @staticmethod
+    def make_font(size, bold):
+        """
+        Create a font of the theme family with the given pixel size.
+        """
+        font = QFont(FONT_FAMILY)
+        font.setStyleHint(QFont.SansSerif)
+        font.setPixelSize(size)
+        font.setBold(bold)
+        return font
+
+    def color(self, token):
+        return self.colors[token]
+
+    def font(self, token):
+        return self.fonts[token]
+
+
+class ThemeManager:
+    """
+    Keeps the resolved themes and applies the current one to the application
+    and to widgets registered with a role.
+    """
+    def __init__(self):
+        self._themes = {}
+        self._current = None
+
+    def theme(self, name):
+        """
+        Return the resolved theme called `name`, resolving it on first use.
+        """
+        if name not in self._themes:
+            spec = THEMES.get(name, THEMES[DEFAULT_THEME])
+            self._themes[name] = Theme(name, spec['colors'], spec['fonts'])
+        return self._themes[name]
+
+    @property
+    def current(self):
+        if self._current is None:
+            self._current = self.theme(DEFAULT_THEME)
+        return self._current
+
+    def set_theme(self, name):
+        """
+        Make `name` the current theme and re-apply it to every themed widget.
+        """
+        self._current = self.theme(name)
+        app = QApplication.instance()
+        app.setPalette(self._current.palette)
+        app.setFont(self._current.font('base'))
+        for widget in app.allWidgets():
+            role = widget.property(ROLE_PROPERTY)
+            if role:
+                self._apply(widget, role)
+
+    def apply(self, widget, role):
+        """
+        Give `widget` the colours and font of `role` in the current theme.
+        """
+        widget.setProperty(ROLE_PROPERTY, role)
+        self._apply(widget, role)
+
+    def _apply(self, widget, role):
+        theme = self.current
+        spec = ROLES[role]
+        if role in theme.role_palettes:
+            widget.setPalette(theme.role_palettes[role])
+        if 'font' in spec:
+            widget.setFont(theme.font(spec['font']))
+        for name, token in spec.get('properties', {}).items():
+            widget.setProperty(name, theme.color(token))
+
+
+# set_theme() on this instance restyles every widget passed to apply()
+theme_manager = ThemeManager()
@@ -1,28 +1,47 @@
 import os
+import time
 import random
 
 from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QSlider, QDialog
-from PyQt5.QtCore import Qt, QTimer, QPoint, QRect, QUrl
-from PyQt5.QtGui import QImage, QPixmap, QPainter, QColor
+from PyQt5.QtCore import Qt, QTimer, QPoint, QRect, QUrl, pyqtSignal
+from PyQt5.QtGui import QPainter, QColor, QPalette
 from PyQt5.QtMultimedia import QMediaPlayer, QMediaContent, QMediaPlaylist
 
-from UVtimer.settings_window import SettingsWindow
-from UVtimer.utils import IconButton, load_stylesheet
-from UVtimer.notifications import NotificationWindow, MicroRestNotification
-from UVtimer.constants import MICRO_REST_MIN, MICRO_REST_MAX
+from UVtimer.utils import IconButton
+from UVtimer.countdown import CountdownDisplay
+from UVtimer.theme import theme_manager
+from UVtimer.image_cache import image_cache
+from UVtimer.notifications import NotificationWindow, MicroRestNotification, TaskDialog
+from UVtimer.constants import MICRO_REST_MIN, MICRO_REST_MAX, NOTIFICATION_VOLUME
+from UVtimer.hooks import hook_dispatcher
+from UVtimer.loudness import loudness_analyzer
+from UVtimer.tasks import task_store
+from UVtimer.journal import SessionJournal, SessionState, RUNNING, PAUSED, resumed_remaining
+
+TASK_HINT = "Double-click to choose a task"
 
 
 class TimerWindow(QWidget):
     """
     This class represents the main timer window of the UVPomodoro application.
     It displays the timer, controls, and handles the timer logic.
+    The window owns its timers, media players and notification dialogs and
+    deletes itself when closed; `stopped` is emitted so the owner can drop its
+    reference and show the settings window again.
+
+    Every state change is written to a session journal; passing the last
+    journaled SessionState as `resume` continues an interrupted session.
+    Double-clicking the window labels the current session with a task.
     """
 
-    def __init__(self, settings):
+    stopped = pyqtSignal()
+
+    def __init__(self, settings, resume=None):
         super().__init__()
         self.settings = settings
-        self.setStyleSheet(load_stylesheet('style.qss'))
-        
+        self.setAttribute(Qt.WA_DeleteOnClose)
+        theme_manager.apply(self, 'timer_window')
+
         # Set window properties
         self.setWindowFlags(Qt.WindowStaysOnTopHint | Qt.FramelessWindowHint)
         self.setAttribute(Qt.WA_TranslucentBackground)
@@ -32,27 +51,28 @@ class TimerWindow(QWidget):
         
         # Initialize background image variables
         self.background_image = None
-        self.transparent_background = None
+        self.background_rect = QRect()
 
         # Set up the main layout
         self.layout = QVBoxLayout(self)
 
         # Create and style the time display label
-        self.time_label = QLabel(f"{self.settings['run_time']:02d}:00")
-        self.time_label.setAlignment(Qt.AlignCenter)
-        self.time_label.setStyleSheet("font-size: 48px; color: #88C0D0;")
+        self.time_label = CountdownDisplay(f"{self.settings['run_time']:02d}:00")
+        theme_manager.apply(self.time_label, 'timer')
         self.layout.addWidget(self.time_label)
 
         # Add session counter if enabled in settings
         if self.settings['display_session_counter']:
             self.session_label = QLabel("Session: 1")
             self.session_label.setAlignment(Qt.AlignCenter)
-            self.session_label.setStyleSheet("font-size: 14px; color: #D8DEE9;")
+            theme_manager.apply(self.session_label, 'session')
             self.layout.addWidget(self.session_label)
             window_height += 10
             self.setFixedHeight(window_height)
 
         # Add music controls if enabled in settings
+        self.music_files = []
+        self.music_volume = 50
         if self.settings['display_music_controller']:
             music_control_layout = QHBoxLayout()
 
@@ -67,56 +87,43 @@ class TimerWindow(QWidget):
             self.layout.addLayout(music_control_layout)
 
             # Set up background music playlist and player
-            self.background_playlist = QMediaPlaylist()
+            self.background_playlist = QMediaPlaylist(self)
             self.load_background_music()
             self.background_playlist.setPlaybackMode(QMediaPlaylist.Loop)
 
-            self.background_music = QMediaPlayer()
+            self.background_music = QMediaPlayer(self)
             self.background_music.setPlaylist(self.background_playlist)
-            self.background_music.setVolume(50)
+            self.background_playlist.currentIndexChanged.connect(self.apply_track_gain)
+            self.apply_track_gain()
             self.background_music.play()
 
             window_height += 30
             self.setFixedHeight(window_height)
         
         # Set up background image if provided in settings
+        # The shared cache returns the image already scaled to fit the window
         if self.settings['background_image']:
-            self.background_image = QImage(self.settings['background_image'])
-            self.transparent_background = QPixmap(self.size())
-            self.transparent_background.fill(Qt.transparent)
-            painter = QPainter(self.transparent_background)
-            painter.setOpacity(self.settings['background_opacity'])
-            
-            # Calculate image scaling to fit the window
-            image_ratio = self.background_image.width() / self.background_image.height()
-            window_ratio = self.width() / self.height()
-            
-            if image_ratio > window_ratio:
-                new_width = self.width()
-                new_height = int(new_width / image_ratio)
-                x = 0
-                y = (self.height() - new_height) // 2
-            else:
-                new_height = self.height()
-                new_width = int(new_height * image_ratio)
+            self.background_image = image_cache.get(self.settings['background_image'], self.size(), self.devicePixelRatioF())
+            if self.background_image is not None:
+                dpr = self.background_image.devicePixelRatio()
+                new_width = int(self.background_image.width() / dpr)
+                new_height = int(self.background_image.height() / dpr)
                 x = (self.width() - new_width) // 2
-                y = 0
-
-            target_rect = QRect(x, y, new_width, new_height)
-            painter.drawImage(target_rect, self.background_image)
-            painter.end()
-        else:
-            self.transparent_background = None
+                y = (self.height() - new_height) // 2
+                self.background_rect = QRect(x, y, new_width, new_height)
 
         # Create control buttons
         button_layout = QHBoxLayout()
-        self.pause_button = IconButton("#5E81AC", "pause")
+        self.pause_button = IconButton(None, "pause")
+        theme_manager.apply(self.pause_button, 'pause_button')
         self.pause_button.clicked.connect(self.toggle_pause)
 
-        self.stop_button = IconButton("#BF616A", "stop")
+        self.stop_button = IconButton(None, "stop")
+        theme_manager.apply(self.stop_button, 'stop_button')
         self.stop_button.clicked.connect(self.stop_timer)
 
-        self.skip_button = IconButton("#EBCB8B", "skip")
+        self.skip_button = IconButton(None, "skip")
+        theme_manager.apply(self.skip_button, 'skip_button')
         self.skip_button.clicked.connect(self.skip_session)
 
         button_layout.addWidget(self.pause_button)
@@ -131,20 +138,42 @@ class TimerWindow(QWidget):
         self.remaining_time = self.settings['run_time'] * 60
         self.is_break = False
         self.session_count = 1
+        self.deadline = 0.0
+        self.micro_rest_deadline = 0.0
+        self.current_task = ""
+        self.task_dialog = None
+        self.setToolTip(TASK_HINT)
+        task_store.preload()
 
         # Set up micro-rest timer
         self.micro_rest_timer = QTimer(self)
         self.micro_rest_timer.timeout.connect(self.show_micro_rest)
 
-        self.start_timer()
+        # Journal the timer state so an interrupted session can be resumed
+        self.journal = SessionJournal()
+        self.journal.begin(self.settings)
+
+        if resume is not None:
+            self.restore_session(resume)
+            # A session journaled as paused is restored paused
+            if self.timer.isActive():
+                self.emit_hook('resume')
+        else:
+            self.start_timer()
+            self.emit_hook('session_start')
 
         # Initialize variables for window dragging
         self.moving = False
         self.offset = QPoint()
 
         # Set up notification sound
-        self.notification_sound = QMediaPlayer()
+        self.notification_sound = QMediaPlayer(self)
         self.notification_sound.setMedia(QMediaContent(QUrl.fromLocalFile(self.settings['notification_sound'])))
+        self.apply_notification_gain()
+
+        # Measure track loudness in the background; gains apply once results arrive
+        loudness_analyzer.analyzed.connect(self.on_loudness_analyzed)
+        loudness_analyzer.analyze(self.music_files + [self.settings['notification_sound']])
 
     def paintEvent(self, event):
         """
@@ -153,15 +182,32 @@ class TimerWindow(QWidget):
         painter = QPainter(self)
         painter.setRenderHint(QPainter.Antialiasing)
 
-        if self.transparent_background:
-            painter.drawPixmap(0, 0, self.transparent_background)
+        if self.background_image is not None:
+            painter.setOpacity(self.settings['background_opacity'])
+            painter.drawImage(self.background_rect, self.background_image)
         else:
-            background_color = QColor(46, 52, 64)
+            background_color = QColor(self.palette().color(QPalette.Window))
             background_color.setAlpha(int(255 * self.settings['background_opacity']))
             painter.setBrush(background_color)
             painter.setPen(Qt.NoPen)
             painter.drawRoundedRect(self.rect(), 10, 10)
 
+    def closeEvent(self, event):
+        """
+        Stop timers and media playback and release the background image
+        before the window is deleted.
+        """
+        self.timer.stop()
+        self.micro_rest_timer.stop()
+        self.journal.close()
+        loudness_analyzer.analyzed.disconnect(self.on_loudness_analyzed)
+        self.notification_sound.stop()
+        if self.settings['display_music_controller']:
+            self.background_music.stop()
+        self.background_image = None
+        super().closeEvent(event)
+        self.stopped.emit()
+
     def mousePressEvent(self, event):
         """
         Handle mouse press event for window dragging.
@@ -177,6 +223,13 @@ class TimerWindow(QWidget):
         if self.moving:
             self.move(event.globalPos() - self.offset)
 
+    def mouseDoubleClickEvent(self, event):
+        """
+        Open the task dialog on a double click, without stopping the timer.
+        """
+        if event.button() == Qt.LeftButton:
+            self.pick_task()
+
     def mouseReleaseEvent(self, event):
         """
         Handle mouse release event for window dragging.
@@ -184,15 +237,67 @@ class TimerWindow(QWidget):
         if event.button() == Qt.LeftButton:
             self.moving = False
 
-    def start_timer(self):
+    def start_timer(self, micro_rest_interval=None):
         """
         Start the main timer and update the display.
         """
         minutes, seconds = divmod(self.remaining_time, 60)
         self.time_label.setText(f"{minutes:02d}:{seconds:02d}")
         self.timer.start(1000)
+        self.deadline = time.time() + self.remaining_time
         if not self.is_break:
-            self.start_micro_rest_timer()
+            self.start_micro_rest_timer(micro_rest_interval)
+        self.record_state(RUNNING)
+
+    def record_state(self, state):
+        """
+        Write the current timer state to the session journal.
+        """
+        running = state == RUNNING
+        micro_rest_deadline = self.micro_rest_deadline if running and self.micro_rest_timer.isActive() else 0.0
+        self.journal.record(SessionState(state, self.is_break, self.session_count, self.remaining_time,
+                                         self.deadline if running else 0.0, micro_rest_deadline, self.current_task))
+
+    def emit_hook(self, event):
+        """
+        Report a session transition to the user hooks. Hooks run on worker
+        threads, so this returns immediately.
+        """
+        hook_dispatcher.emit(event, {
+            'is_break': self.is_break,
+            'session_count': self.session_count,
+            'remaining': self.remaining_time,
+            'task': self.current_task,
+            'timestamp': time.time(),
+        })
+
+    def restore_session(self, session):
+        """
+        Continue a journaled session, using the wall clock to find how much of
+        the phase and of the micro-rest interval is left.
+        """
+        self.is_break = session.is_break
+        self.session_count = session.session_count
+        self.remaining_time = resumed_remaining(session)
+        self.current_task = session.task
+        self.setToolTip(session.task or TASK_HINT)
+        if self.settings['display_session_counter']:
+            self.session_label.setText(f"Session: {self.session_count}")
+
+        if self.remaining_time <= 0:
+            # The phase ended while the application was not running
+            self.remaining_time = 1
+            self.start_timer()
+        elif session.state == RUNNING:
+            micro_rest_interval = None
+            if session.micro_rest_deadline:
+                micro_rest_interval = max(1000, int((session.micro_rest_deadline - time.time()) * 1000))
+            self.start_timer(micro_rest_interval)
+        else:
+            minutes, seconds = divmod(self.remaining_time, 60)
+            self.time_label.setText(f"{minutes:02d}:{seconds:02d}")
+            self.pause_button.icon_path = "play"
+            self.record_state(PAUSED)
 
     def update_timer(self):
         """
@@ -214,25 +319,24 @@ class TimerWindow(QWidget):
         if self.timer.isActive():
             self.timer.stop()
             self.micro_rest_timer.stop()
+            self.record_state(PAUSED)
+            self.emit_hook('pause')
             self.pause_button.icon_path = "play"
         else:
             self.start_timer()
+            self.emit_hook('resume')
             self.pause_button.icon_path = "pause"
         self.pause_button.update()
 
     def stop_timer(self):
         """
         Stop the timer and close the timer window.
-        This method stops all timers, stops the background music if it's enabled,
-        closes the current window, and opens the settings window.
+        Timers and background music are stopped in closeEvent, and the
+        settings window is shown again by whoever listens to `stopped`.
         """
-        self.timer.stop()
-        self.micro_rest_timer.stop()
-        if self.settings['display_music_controller']:
-            self.background_music.stop()
+        self.journal.clear()
+        self.emit_hook('stop')
         self.close()
-        self.settings_window = SettingsWindow()
-        self.settings_window.show()
 
     def skip_session(self):
         """
@@ -257,14 +361,18 @@ class TimerWindow(QWidget):
                 self.remaining_time = self.settings['long_rest_time'] * 60
             else:
                 self.remaining_time = self.settings['rest_time'] * 60
+        self.emit_hook('break_start' if self.is_break else 'session_start')
 
-    def start_micro_rest_timer(self):
+    def start_micro_rest_timer(self, interval=None):
         """
         Start the micro-rest timer if enabled in settings.
+        A random interval is used unless `interval` (in ms) is given.
         """
         if self.settings['activate_micro_rest'] and not self.is_break:
-            interval = random.randint(MICRO_REST_MIN, MICRO_REST_MAX) * 1000
+            if interval is None:
+                interval = random.randint(MICRO_REST_MIN, MICRO_REST_MAX) * 1000
             self.micro_rest_timer.start(interval)
+            self.micro_rest_deadline = time.time() + interval / 1000
 
     def show_micro_rest(self):
         """
@@ -273,9 +381,14 @@ class TimerWindow(QWidget):
         if not self.is_break:
             self.timer.stop()
             self.micro_rest_timer.stop()
+            self.record_state(PAUSED)
+            self.emit_hook('micro_rest_start')
             micro_rest = MicroRestNotification(self)
-            if micro_rest.exec_() == QDialog.Accepted:
+            result = micro_rest.exec_()
+            micro_rest.deleteLater()
+            if result == QDialog.Accepted:
                 self.start_timer()
+                self.emit_hook('micro_rest_end')
 
     def show_notification(self):
         """
@@ -283,14 +396,52 @@ class TimerWindow(QWidget):
         """
         self.timer.stop()
         self.micro_rest_timer.stop()
+        self.record_state(PAUSED)
+        self.emit_hook('session_end')
         notification = NotificationWindow(self)
-        if notification.exec_() == QDialog.Accepted:
+        result = notification.exec_()
+        task = notification.task()
+        notification.deleteLater()
+        if result == QDialog.Accepted:
+            if self.is_break:
+                self.set_task(task)
             self.toggle_session()
             self.start_timer()
         else:
+            self.journal.clear()
+            self.emit_hook('stop')
             self.close()
-            self.settings_window = SettingsWindow()
-            self.settings_window.show()
+
+    def pick_task(self):
+        """
+        Show the task dialog for the running session, or raise it if it is already open.
+        """
+        if self.task_dialog is None:
+            self.task_dialog = TaskDialog(self)
+            self.task_dialog.finished.connect(self.on_task_picked)
+        self.task_dialog.show()
+        self.task_dialog.raise_()
+        self.task_dialog.activateWindow()
+
+    def on_task_picked(self, result):
+        """
+        Label the running session with the task of the closed dialog if it was accepted.
+        """
+        task = self.task_dialog.task()
+        self.task_dialog.deleteLater()
+        self.task_dialog = None
+        if result == QDialog.Accepted and task != self.current_task:
+            self.set_task(task)
+            self.record_state(RUNNING if self.timer.isActive() else PAUSED)
+
+    def set_task(self, task):
+        """
+        Label the upcoming focus session with `task` and count it for the task ranking.
+        """
+        self.current_task = task
+        self.setToolTip(task or TASK_HINT)
+        if task:
+            task_store.record_use(task)
 
     def load_background_music(self):
         """
@@ -300,7 +451,9 @@ class TimerWindow(QWidget):
         if os.path.exists(music_dir):
             for file in random.sample(os.listdir(music_dir), len(os.listdir(music_dir))):
                 if file.endswith((".mp3", ".wav", ".ogg")):
-                    self.background_playlist.addMedia(QMediaContent(QUrl.fromLocalFile(os.path.join(music_dir, file))))
+                    path = os.path.join(music_dir, file)
+                    self.music_files.append(path)
+                    self.background_playlist.addMedia(QMediaContent(QUrl.fromLocalFile(path)))
 
     def toggle_background_music(self):
         """
@@ -316,4 +469,32 @@ class TimerWindow(QWidget):
         """
         Set the volume of the background music.
         """
-        self.background_music.setVolume(volume)
+        self.music_volume = volume
+        self.apply_track_gain()
+
+    def apply_track_gain(self):
+        """
+        Set the player volume to the slider volume corrected by the loudness of the current track.
+        """
+        track = self.background_playlist.currentMedia().canonicalUrl().toLocalFile()
+        factor = loudness_analyzer.factor(track) if track else 1.0
+        self.background_music.setVolume(min(100, round(self.music_volume * factor)))
+
+    def apply_notification_gain(self):
+        """
+        Set the notification volume from the loudness of the notification sound,
+        relative to NOTIFICATION_VOLUME so that a quiet sound can be raised.
+        """
+        factor = loudness_analyzer.factor(self.settings['notification_sound'])
+        self.notification_sound.setVolume(min(100, round(NOTIFICATION_VOLUME * factor)))
+
+    def on_loudness_analyzed(self, path):
+        """
+        Re-apply the gain when the current track or the notification sound has been measured.
+        """
+        if self.settings['display_music_controller']:
+            track = self.background_playlist.currentMedia().canonicalUrl().toLocalFile()
+            if track and os.path.abspath(track) == path:
+                self.apply_track_gain()
+        if os.path.abspath(self.settings['notification_sound']) == path:
+            self.apply_notification_gain()
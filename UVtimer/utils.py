@@ -19,8 +19,9 @@ def load_stylesheet(file_path):
 
 class IconButton(QPushButton):
     def __init__(self, color, icon_path, parent=None):
+        # The color may be left as None and set later through the iconColor property
         super().__init__(parent)
-        self._color = QColor(color)
+        self._color = QColor(color) if color is not None else QColor()
         self.icon_path = icon_path
         self.setFixedSize(32, 32)
 
@@ -1,18 +1,69 @@
 import sys
+import argparse
+import multiprocessing
 
 from PyQt5.QtWidgets import QApplication
 
-from UVtimer.settings_window import SettingsWindow
+from UVtimer.config import load_config, load_profiles
+from UVtimer.hooks import hook_dispatcher
+from UVtimer.journal import load_session, clear_session
+from UVtimer.launcher import Launcher
+from UVtimer.loudness import loudness_analyzer
+from UVtimer.tasks import task_store
+from UVtimer.theme import theme_manager, DEFAULT_THEME
 from UVtimer.utils import load_stylesheet
 
 
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="UVPomodoro timer.")
+    parser.add_argument('--start', metavar='PROFILE', help="start the timer with a saved profile, skipping the settings window")
+    parser.add_argument('--no-resume', action='store_true', help="discard an interrupted session instead of resuming it")
+    parser.add_argument('--import-tasks', metavar='FILE', help="add the tasks in FILE, one per line, to the task list and exit")
+    return parser, parser.parse_args(argv)
+
+
 def main():
-    app = QApplication(sys.argv)
+    parser, args = parse_args(sys.argv[1:])
+    if args.import_tasks is not None:
+        with open(args.import_tasks, 'r') as f:
+            task_store.import_titles(f)
+        print(f"{len(task_store)} tasks")
+        return
+    profile = None
+    if args.start is not None:
+        profiles = load_profiles()
+        if args.start not in profiles:
+            parser.error(f"unknown profile '{args.start}' (available: {', '.join(profiles) or 'none'})")
+        profile = profiles[args.start]
+
+    # An interrupted session is resumed unless a profile was asked for
+    interrupted = None
+    if args.no_resume:
+        clear_session()
+    elif profile is None:
+        interrupted = load_session()
+
+    app = QApplication(sys.argv[:1])
     app.setStyleSheet(load_stylesheet('style.qss'))
-    settings_window = SettingsWindow()
-    settings_window.show()
-    sys.exit(app.exec_())
+    theme_config = profile or (interrupted[0] if interrupted else load_config())
+    theme_manager.set_theme(theme_config.get('theme', DEFAULT_THEME))
+    hook_dispatcher.configure(load_config())
+
+    launcher = Launcher()
+    if interrupted is not None:
+        launcher.resume(*interrupted)
+    elif profile is not None:
+        launcher.start_profile(profile)
+    else:
+        launcher.show_settings()
+    exit_code = app.exec_()
+    hook_dispatcher.shutdown(wait=False)
+    loudness_analyzer.shutdown()
+    task_store.flush()
+    sys.exit(exit_code)
 
 
 if __name__ == '__main__':
+    # Lets loudness workers start from a frozen release build without rerunning the GUI
+    multiprocessing.freeze_support()
     main()